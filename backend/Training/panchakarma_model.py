@@ -2,8 +2,11 @@
 Panchakarma Therapy Recommendation Engine
 Maps Dosha imbalances to appropriate Panchakarma treatments
 """
+import copy
 import os
+import json
 import pickle
+from functools import lru_cache
 
 # Panchakarma therapy recommendations based on Dosha
 PANCHAKARMA_RECOMMENDATIONS = {
@@ -54,6 +57,112 @@ PANCHAKARMA_RECOMMENDATIONS = {
     }
 }
 
+# Detailed information for each Panchakarma therapy
+THERAPY_DETAILS = {
+    'Vamana': {
+        'description': 'Therapeutic emesis using medicated substances to eliminate excess Kapha dosha from the upper body.',
+        'duration': '7-15 days',
+        'benefits': 'Clears respiratory tract, improves digestion, reduces phlegm',
+        'precautions': 'Not recommended for Vata-dominant individuals, pregnant women, elderly'
+    },
+    'Virechana': {
+        'description': 'Purgation therapy using herbal laxatives to cleanse the intestines and eliminate Pitta dosha.',
+        'duration': '7-15 days',
+        'benefits': 'Detoxifies liver, improves skin health, balances metabolism',
+        'precautions': 'Avoid in severe weakness, during menstruation, certain medical conditions'
+    },
+    'Basti': {
+        'description': 'Medicated enema therapy using herbal oils and decoctions to balance Vata dosha and nourish tissues.',
+        'duration': '8-30 days',
+        'benefits': 'Strengthens colon, improves elimination, calms nervous system',
+        'precautions': 'Not recommended during acute illness, certain digestive disorders'
+    },
+    'Nasya': {
+        'description': 'Nasal administration of medicated oils to cleanse and nourish the head and neck region.',
+        'duration': '7-14 days',
+        'benefits': 'Clears sinuses, improves voice, enhances mental clarity',
+        'precautions': 'Avoid after meals, during acute cold, certain conditions'
+    },
+    'Raktamokshana': {
+        'description': 'Bloodletting therapy to eliminate toxins and excess Pitta from the blood.',
+        'duration': 'As needed',
+        'benefits': 'Purifies blood, treats skin conditions, reduces inflammation',
+        'precautions': 'Requires expert supervision, not for everyone'
+    },
+    'Abhyanga': {
+        'description': 'Full body oil massage with warm medicated oils to balance Vata and promote relaxation.',
+        'duration': '45-60 minutes per session',
+        'benefits': 'Nourishes skin, calms nervous system, improves circulation',
+        'precautions': 'Avoid on full stomach, certain skin conditions'
+    },
+    'Shirodhara': {
+        'description': 'Continuous pouring of warm medicated oil on the forehead to calm the mind.',
+        'duration': '30-45 minutes per session',
+        'benefits': 'Reduces stress, improves sleep, balances all doshas',
+        'precautions': 'Avoid with certain head conditions'
+    },
+    'Udvartana': {
+        'description': 'Dry powder massage to reduce Kapha and improve circulation.',
+        'duration': '30-45 minutes per session',
+        'benefits': 'Reduces excess weight, improves skin tone, stimulates metabolism',
+        'precautions': 'Avoid on sensitive skin'
+    },
+    'Swedana': {
+        'description': 'Herbal steam therapy to induce sweating and eliminate toxins.',
+        'duration': '15-30 minutes per session',
+        'benefits': 'Opens pores, improves circulation, reduces stiffness',
+        'precautions': 'Avoid in high blood pressure, certain conditions'
+    },
+    'Takradhara': {
+        'description': 'Pouring of medicated buttermilk on forehead, beneficial for Pitta conditions.',
+        'duration': '30-45 minutes per session',
+        'benefits': 'Cools the system, reduces inflammation, calms Pitta',
+        'precautions': 'Avoid in cold conditions'
+    }
+}
+
+class FrozenDict(dict):
+    """Read-only dict for shared, cached results (still JSON-serializable)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Cached recommendations are read-only; copy before modifying")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        # The default dict-subclass pickling restores items via __setitem__;
+        # unpickle as a plain dict instead (process pool results, caches)
+        return (dict, (dict(self),))
+
+    def __deepcopy__(self, memo):
+        """A deep copy is a plain, mutable dict"""
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+def freeze(value):
+    """Read-only copy of a nested dict/list structure (dicts become FrozenDicts, lists tuples)"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def recommendation_key(dosha_results):
+    """
+    Reduce dosha results to the inputs recommendations depend on
+
+    Returns:
+        Tuple of (dominant_dosha, secondary_dosha or None when the secondary
+        dosha is not significant)
+    """
+    dominant = dosha_results.get('dominant_dosha', 'vata')
+    secondary = dosha_results.get('secondary_dosha')
+    percentages = dosha_results.get('percentages', {})
+    if secondary and percentages.get(secondary, 0) > 30:
+        return (dominant, secondary)
+    return (dominant, None)
+
 def get_panchakarma_recommendations(dosha_results):
     """
     Get Panchakarma therapy recommendations based on dosha assessment
@@ -61,22 +170,33 @@ def get_panchakarma_recommendations(dosha_results):
     Args:
         dosha_results: Dictionary with dosha percentages and dominant dosha
         
+    Returns:
+        Read-only dictionary with therapy recommendations, shared between
+        callers with the same dominant/secondary doshas
+    """
+    return get_recommendations_for_key(recommendation_key(dosha_results))
+
+def build_recommendations(key):
+    """
+    Build Panchakarma therapy recommendations for a recommendation_key()
+    
+    Args:
+        key: Tuple of (dominant_dosha, significant secondary_dosha or None)
+        
     Returns:
         Dictionary with therapy recommendations
     """
-    dominant = dosha_results.get('dominant_dosha', 'vata')
-    secondary = dosha_results.get('secondary_dosha')
-    percentages = dosha_results.get('percentages', {})
+    dominant, secondary = key
     
     # Get primary recommendations for dominant dosha
     recommendations = PANCHAKARMA_RECOMMENDATIONS[dominant].copy()
     
     # Add secondary dosha considerations if significant
-    if secondary and percentages.get(secondary, 0) > 30:
+    if secondary:
         secondary_recs = PANCHAKARMA_RECOMMENDATIONS[secondary]
-        # Combine therapies, avoiding contraindications
-        combined_primary = list(set(recommendations['primary'] + secondary_recs['primary']))
-        combined_secondary = list(set(recommendations['secondary'] + secondary_recs['secondary']))
+        # Combine therapies (dominant dosha's first), avoiding contraindications
+        combined_primary = list(dict.fromkeys(recommendations['primary'] + secondary_recs['primary']))
+        combined_secondary = list(dict.fromkeys(recommendations['secondary'] + secondary_recs['secondary']))
         
         # Remove contraindications
         contraindications = set(recommendations.get('contraindications', []) + 
@@ -87,75 +207,11 @@ def get_panchakarma_recommendations(dosha_results):
         recommendations['primary'] = combined_primary[:2]  # Limit to top 2
         recommendations['secondary'] = combined_secondary[:2]
     
-    # Add therapy details
-    therapy_details = {
-        'Vamana': {
-            'description': 'Therapeutic emesis using medicated substances to eliminate excess Kapha dosha from the upper body.',
-            'duration': '7-15 days',
-            'benefits': 'Clears respiratory tract, improves digestion, reduces phlegm',
-            'precautions': 'Not recommended for Vata-dominant individuals, pregnant women, elderly'
-        },
-        'Virechana': {
-            'description': 'Purgation therapy using herbal laxatives to cleanse the intestines and eliminate Pitta dosha.',
-            'duration': '7-15 days',
-            'benefits': 'Detoxifies liver, improves skin health, balances metabolism',
-            'precautions': 'Avoid in severe weakness, during menstruation, certain medical conditions'
-        },
-        'Basti': {
-            'description': 'Medicated enema therapy using herbal oils and decoctions to balance Vata dosha and nourish tissues.',
-            'duration': '8-30 days',
-            'benefits': 'Strengthens colon, improves elimination, calms nervous system',
-            'precautions': 'Not recommended during acute illness, certain digestive disorders'
-        },
-        'Nasya': {
-            'description': 'Nasal administration of medicated oils to cleanse and nourish the head and neck region.',
-            'duration': '7-14 days',
-            'benefits': 'Clears sinuses, improves voice, enhances mental clarity',
-            'precautions': 'Avoid after meals, during acute cold, certain conditions'
-        },
-        'Raktamokshana': {
-            'description': 'Bloodletting therapy to eliminate toxins and excess Pitta from the blood.',
-            'duration': 'As needed',
-            'benefits': 'Purifies blood, treats skin conditions, reduces inflammation',
-            'precautions': 'Requires expert supervision, not for everyone'
-        },
-        'Abhyanga': {
-            'description': 'Full body oil massage with warm medicated oils to balance Vata and promote relaxation.',
-            'duration': '45-60 minutes per session',
-            'benefits': 'Nourishes skin, calms nervous system, improves circulation',
-            'precautions': 'Avoid on full stomach, certain skin conditions'
-        },
-        'Shirodhara': {
-            'description': 'Continuous pouring of warm medicated oil on the forehead to calm the mind.',
-            'duration': '30-45 minutes per session',
-            'benefits': 'Reduces stress, improves sleep, balances all doshas',
-            'precautions': 'Avoid with certain head conditions'
-        },
-        'Udvartana': {
-            'description': 'Dry powder massage to reduce Kapha and improve circulation.',
-            'duration': '30-45 minutes per session',
-            'benefits': 'Reduces excess weight, improves skin tone, stimulates metabolism',
-            'precautions': 'Avoid on sensitive skin'
-        },
-        'Swedana': {
-            'description': 'Herbal steam therapy to induce sweating and eliminate toxins.',
-            'duration': '15-30 minutes per session',
-            'benefits': 'Opens pores, improves circulation, reduces stiffness',
-            'precautions': 'Avoid in high blood pressure, certain conditions'
-        },
-        'Takradhara': {
-            'description': 'Pouring of medicated buttermilk on forehead, beneficial for Pitta conditions.',
-            'duration': '30-45 minutes per session',
-            'benefits': 'Cools the system, reduces inflammation, calms Pitta',
-            'precautions': 'Avoid in cold conditions'
-        }
-    }
-    
     # Add detailed information for recommended therapies
     recommended_therapies = []
     for therapy_name in recommendations['primary']:
-        if therapy_name in therapy_details:
-            therapy_info = therapy_details[therapy_name].copy()
+        if therapy_name in THERAPY_DETAILS:
+            therapy_info = THERAPY_DETAILS[therapy_name].copy()
             therapy_info['name'] = therapy_name
             recommended_therapies.append(therapy_info)
     
@@ -163,6 +219,40 @@ def get_panchakarma_recommendations(dosha_results):
     
     return recommendations
 
+# Recommendations depend only on recommendation_key(), so each key is built
+# once and shared. Bounded so richer keys added later cannot grow it forever.
+RECOMMENDATION_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def get_recommendations_for_key(key):
+    """
+    Get cached, read-only Panchakarma therapy recommendations for a key
+    
+    Args:
+        key: Hashable recommendation_key() tuple
+        
+    Returns:
+        FrozenDict with therapy recommendations (lists become tuples)
+    """
+    return freeze(build_recommendations(key))
+
+@lru_cache(maxsize=RECOMMENDATION_CACHE_SIZE)
+def get_recommendations_json(key):
+    """Pre-serialized JSON bytes of get_recommendations_for_key(key)"""
+    return json.dumps(get_recommendations_for_key(key), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def precompile_recommendations():
+    """Build every dominant x (secondary or None) variant up front"""
+    for dominant in PANCHAKARMA_RECOMMENDATIONS:
+        for secondary in [None] + [d for d in PANCHAKARMA_RECOMMENDATIONS if d != dominant]:
+            get_recommendations_json((dominant, secondary))
+
+def recommendation_cache_stats():
+    info = get_recommendations_for_key.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+
+precompile_recommendations()
+
 def save_panchakarma_model():
     """Save Panchakarma recommendations model"""
     models_dir = os.path.join(os.path.dirname(__file__), '..', 'Models')
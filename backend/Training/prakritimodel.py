@@ -2,14 +2,38 @@
 Dosha (Prakriti) Classification Model
 Determines Vata, Pitta, Kapha scores based on assessment responses
 """
+import copy
 import pickle
 import os
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
-# Dosha assessment question weights
-DOSHA_QUESTIONS = {
+class WeightTable(dict):
+    """Read-only level of DOSHA_QUESTIONS; pickles and deep-copies as a plain dict"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Dosha weights are read-only; use set_dosha_weights() to revise them")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+def freeze_weights(weights):
+    """WeightTable copy of nested dosha -> question -> answer -> weight dicts"""
+    if isinstance(weights, dict):
+        return WeightTable((key, freeze_weights(value)) for key, value in weights.items())
+    return weights
+
+# Dosha assessment question weights. Read-only: revise them with
+# set_dosha_weights() so compiled scoring and result caches see the change
+DOSHA_QUESTIONS = freeze_weights({
     'vata': {
         'body_frame': {'thin': 3, 'medium': 1, 'heavy': 0},
         'skin_type': {'dry': 3, 'rough': 2, 'normal': 1, 'oily': 0},
@@ -46,7 +70,7 @@ DOSHA_QUESTIONS = {
         'stress_response': {'calm': 3, 'peaceful': 2, 'anxious': 0},
         'weather_preference': {'warm': 3, 'hot': 2, 'cold': 0}
     }
-}
+})
 
 def calculate_dosha_scores(assessment_data):
     """
@@ -70,6 +94,18 @@ def calculate_dosha_scores(assessment_data):
                     scores[dosha] += score
                     total_weight[dosha] += 3  # Max possible score per question
     
+    return dosha_results_from_scores(scores)
+
+def dosha_results_from_scores(scores):
+    """
+    Turn raw Vata, Pitta, Kapha scores into percentages and dominant doshas
+    
+    Args:
+        scores: Dictionary with raw score per dosha
+        
+    Returns:
+        Dictionary with dosha scores and percentages
+    """
     # Normalize scores to percentages
     total_score = sum(scores.values())
     if total_score > 0:
@@ -93,6 +129,144 @@ def calculate_dosha_scores(assessment_data):
         'secondary_dosha': secondary_dosha
     }
 
+DOSHA_ORDER = ('vata', 'pitta', 'kapha')
+
+class DoshaScoringEngine:
+    """
+    Vectorized dosha scoring over a dense question x option x dosha weight tensor
+
+    Each question's known answers (across all doshas) get an option index;
+    index 0 is reserved for unknown or missing answers and scores zero, which
+    matches calculate_dosha_scores skipping answers absent from the weights.
+    Assessments are encoded as index vectors, so one NumPy gather-and-sum
+    scores a single assessment or a whole (N x questions) matrix.
+    """
+
+    def __init__(self, weights=DOSHA_QUESTIONS):
+        self.questions = []
+        self.option_index = {}  # question -> {answer: option index}
+        for dosha in DOSHA_ORDER:
+            for question, answer_weights in weights.get(dosha, {}).items():
+                options = self.option_index.setdefault(question, {})
+                if not options:
+                    self.questions.append(question)
+                for answer in answer_weights:
+                    options.setdefault(answer, len(options) + 1)
+        self.question_position = {question: q for q, question in enumerate(self.questions)}
+
+        max_options = max((len(options) for options in self.option_index.values()), default=0) + 1
+        self.weights = np.zeros((len(self.questions), max_options, len(DOSHA_ORDER)), dtype=np.int32)
+        for d, dosha in enumerate(DOSHA_ORDER):
+            for question, answer_weights in weights.get(dosha, {}).items():
+                q = self.question_position[question]
+                for answer, weight in answer_weights.items():
+                    self.weights[q, self.option_index[question][answer], d] = weight
+        self._question_range = np.arange(len(self.questions))
+
+    def encode(self, assessment_data):
+        """Encode one assessment as an option index per question"""
+        encoded = np.zeros(len(self.questions), dtype=np.intp)
+        for question, answer in assessment_data.items():
+            q = self.question_position.get(question)
+            if q is not None:
+                encoded[q] = self.option_index[question].get(answer, 0)
+        return encoded
+
+    def encode_many(self, assessments):
+        """Encode an iterable of assessments as an (N x questions) index matrix"""
+        assessments = list(assessments)
+        encoded = np.zeros((len(assessments), len(self.questions)), dtype=np.intp)
+        for row, assessment_data in enumerate(assessments):
+            encoded[row] = self.encode(assessment_data)
+        return encoded
+
+    def score_encoded(self, encoded):
+        """
+        Raw scores for encoded assessments
+
+        Args:
+            encoded: Index vector (questions,) or matrix (N, questions)
+
+        Returns:
+            Integer array of shape (3,) or (N, 3) in DOSHA_ORDER
+        """
+        return self.weights[self._question_range, encoded].sum(axis=-2)
+
+    def percentages(self, scores):
+        """Percentages per dosha for an (N x 3) score matrix, rounded like calculate_dosha_scores"""
+        scores = np.atleast_2d(scores)
+        totals = scores.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentages = np.round(scores / totals * 100, 2)
+        percentages[totals[:, 0] == 0] = 33.33
+        return percentages
+
+    def rank(self, percentages):
+        """Dosha indices ordered by percentage, ties in DOSHA_ORDER (stable sort)"""
+        return np.argsort(-np.atleast_2d(percentages), axis=1, kind='stable')
+
+    def results_from_scores(self, scores):
+        """dosha_results dict for one row of raw scores"""
+        return dosha_results_from_scores({dosha: int(score) for dosha, score in zip(DOSHA_ORDER, scores)})
+
+    def score(self, assessment_data):
+        """Vectorized equivalent of calculate_dosha_scores for one assessment"""
+        return self.results_from_scores(self.score_encoded(self.encode(assessment_data)))
+
+    def score_many(self, assessments):
+        """
+        Score N assessments with one NumPy operation
+
+        Returns:
+            Dictionary of arrays: scores (N x 3), percentages (N x 3),
+            dominant and secondary dosha indices into DOSHA_ORDER
+        """
+        scores = self.score_encoded(self.encode_many(assessments))
+        percentages = self.percentages(scores)
+        ranking = self.rank(percentages)
+        return {
+            'scores': scores,
+            'percentages': percentages,
+            'dominant': ranking[:, 0],
+            'secondary': ranking[:, 1]
+        }
+
+# Bumped by set_dosha_weights, the only way to change the (read-only)
+# DOSHA_QUESTIONS; compiled engines and result caches compare it to know
+# when the weight tables were revised
+_weights_version = 0
+
+def weights_version():
+    return _weights_version
+
+def set_dosha_weights(weights):
+    """Replace the dosha weight tables in place and invalidate compiled scoring"""
+    global _weights_version
+    # dict methods bypass the read-only guard; callers holding
+    # DOSHA_QUESTIONS see the new tables
+    dict.clear(DOSHA_QUESTIONS)
+    dict.update(DOSHA_QUESTIONS, freeze_weights(weights))
+    _weights_version += 1
+
+def load_dosha_weights(path=None):
+    """Load revised weights from a prakriti_weights.pkl file"""
+    if path is None:
+        path = os.path.join(os.path.dirname(__file__), '..', 'Models', 'prakriti_weights.pkl')
+    with open(path, 'rb') as f:
+        set_dosha_weights(pickle.load(f))
+    return DOSHA_QUESTIONS
+
+_scoring_engine = None
+_scoring_engine_version = None
+
+def get_scoring_engine():
+    """Scoring engine for the current DOSHA_QUESTIONS, rebuilt after set_dosha_weights"""
+    global _scoring_engine, _scoring_engine_version
+    if _scoring_engine is None or _scoring_engine_version != _weights_version:
+        _scoring_engine = DoshaScoringEngine(DOSHA_QUESTIONS)
+        _scoring_engine_version = _weights_version
+    return _scoring_engine
+
 def train_prakriti_model():
     """Train a model for dosha prediction (optional enhancement)"""
     # For now, we use rule-based calculation
@@ -3,27 +3,88 @@ AyurSutra - Main FastAPI Application
 Ayurvedic Dosha Detection & Panchakarma Recommendation Chatbot
 """
 
+import time
+
+_import_started = time.perf_counter()
+
 import sys
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
+from utils.logging_config import configure_logging
+
+# Route logging through a background writer before anything logs at import
+configure_logging()
+logger = logging.getLogger(__name__)
 
-from database.database import engine, Base
-from routes import chat, assessment, pdf
+from database.database import engine, async_engine, Base
+from database.migrations import run_migrations
+from database.write_behind import write_behind
+from routes import chat, assessment, pdf, intent, admin
+from utils import nlp_processor
+from utils.executor import cpu_executor
+from Training.panchakarma_model import recommendation_cache_stats
+from utils.response_cache import assessment_cache
+from utils.pdf_cache import pdf_cache, reports_janitor
+from utils.report_templates import template_cache_stats
+from utils.pdf_jobs import pdf_jobs
+from utils.metrics import registry
+from utils.profiling import ProfileRequestMiddleware
 
 # Add backend directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+run_migrations(engine)
+
+# Startup timings in seconds and warmup outcome, exposed at /health/startup
+STARTUP_TIMINGS = {}
+WARMUP_STATUS = {'state': 'pending', 'error': None}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm NLP resources in a background thread; requests arriving first
+    # load them on demand from local data, so startup never waits on NLTK
+    loop = asyncio.get_running_loop()
+    warmup_started = time.perf_counter()
+
+    def _record_warmup(future):
+        error = future.exception()
+        if error is not None:
+            # Requests still load resources on demand; report the failure
+            WARMUP_STATUS.update(state='failed', error=repr(error))
+            logger.error("NLP warmup failed", exc_info=(type(error), error, error.__traceback__))
+            return
+        WARMUP_STATUS['state'] = 'ok'
+        STARTUP_TIMINGS['nlp_warmup_seconds'] = time.perf_counter() - warmup_started
+
+    WARMUP_STATUS['state'] = 'running'
+    loop.run_in_executor(None, chat.warmup).add_done_callback(_record_warmup)
+    session_sweeper = asyncio.create_task(chat.sweep_sessions())
+    write_behind.start()
+    janitor = asyncio.create_task(reports_janitor(sweeps=(pdf_jobs.expire,)))
+    pdf_jobs.start()
+    STARTUP_TIMINGS['ready_seconds'] = time.perf_counter() - _import_started
+    yield
+    session_sweeper.cancel()
+    janitor.cancel()
+    await pdf_jobs.stop()
+    await write_behind.stop()
+    cpu_executor.shutdown(wait=False)
+    await async_engine.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="AyurSutra API",
     description="Ayurvedic Dosha Detection & Panchakarma Recommendation Chatbot",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -40,10 +101,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# cProfile for requests marked with the profile header (opt-in, see routes/admin.py)
+app.add_middleware(ProfileRequestMiddleware, authorize=admin.admin_authorized)
+
 # Include API routers
 app.include_router(chat.router)
 app.include_router(assessment.router)
 app.include_router(pdf.router)
+app.include_router(intent.router)
+app.include_router(admin.router)
+
+# Startup timing endpoint (registered before the catch-all frontend mount)
+@app.get("/health/startup")
+async def startup_health():
+    return {
+        "timings": STARTUP_TIMINGS,
+        "warmup": WARMUP_STATUS,
+        "nlp": nlp_processor.nlp_status()
+    }
+
+# CPU executor queue and timing stats
+@app.get("/health/executor")
+async def executor_health():
+    return cpu_executor.stats()
+
+# Chat connection and session store gauges
+@app.get("/health/sessions")
+async def sessions_health():
+    return await chat.manager.stats()
+
+# NLP and assessment cache hit rates
+@app.get("/health/caches")
+async def caches_health():
+    return {
+        "nlp": nlp_processor.cache_stats(),
+        "assessment_results": chat.result_cache.stats(),
+        "recommendations": recommendation_cache_stats(),
+        "assessment_responses": assessment_cache.stats(),
+        "pdf_reports": pdf_cache.stats(),
+        "pdf_templates": template_cache_stats()
+    }
+
+# Write-behind queue depth and flush latency
+@app.get("/health/write-behind")
+async def write_behind_health():
+    return write_behind.stats()
+
+# PDF job queue depth and timings
+@app.get("/health/pdf-jobs")
+async def pdf_jobs_health():
+    return pdf_jobs.stats()
+
+# Prometheus scrape endpoint; rendered off the loop since gauges may query the database
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(await asyncio.to_thread(registry.render), media_type="text/plain; version=0.0.4")
 
 # Mount static files for reports
 reports_dir = os.path.join(os.path.dirname(__file__), 'reports')
@@ -54,6 +166,8 @@ app.mount("/reports", StaticFiles(directory=reports_dir), name="reports")
 frontend_build_dir = os.path.join(os.path.dirname(__file__), "../frontend/build")
 app.mount("/", StaticFiles(directory=frontend_build_dir, html=True), name="frontend")
 
+STARTUP_TIMINGS['import_seconds'] = time.perf_counter() - _import_started
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -63,7 +177,8 @@ async def root():
         "endpoints": {
             "websocket": "/ws/chat",
             "assessment": "/api/assessment",
-            "pdf": "/api/pdf/generate"
+            "pdf": "/api/pdf/generate",
+            "intent_batch": "/api/intent/batch"
         }
     }
 
@@ -0,0 +1,80 @@
+"""
+Assessment Response Encoding Benchmark
+Per-response latency (p50/p99) and allocated bytes of the default
+Pydantic model + jsonable_encoder + JSONResponse path versus splicing the
+pre-serialized recommendation bytes into the response body
+
+Run from the backend directory:
+    python -m benchmarks.assessment_response [--calls 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from Training.panchakarma_model import get_panchakarma_recommendations, recommendation_key
+from Training.prakritimodel import dosha_results_from_scores
+from routes.assessment import AssessmentResponse
+from utils.responses import RawJSONResponse, assessment_response_body
+
+SAMPLE_SCORES = [
+    {'vata': 5, 'pitta': 1, 'kapha': 4},
+    {'vata': 2, 'pitta': 7, 'kapha': 1},
+    {'vata': 2, 'pitta': 3, 'kapha': 5},
+]
+
+def model_response(dosha_results):
+    response = AssessmentResponse(
+        dosha_results=dosha_results,
+        panchakarma_recs=get_panchakarma_recommendations(dosha_results)
+    )
+    return JSONResponse(jsonable_encoder(response))
+
+def spliced_response(dosha_results):
+    return RawJSONResponse(assessment_response_body(dosha_results, recommendation_key(dosha_results)))
+
+def measure(fn, samples, calls):
+    latencies = []
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(samples[i % len(samples)])
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for i in range(1000):
+        fn(samples[i % len(samples)])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'peak_bytes_per_1000': peak - before
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    samples = [dosha_results_from_scores(scores) for scores in SAMPLE_SCORES]
+    model_path = measure(model_response, samples, args.calls)
+    spliced_path = measure(spliced_response, samples, args.calls)
+
+    print(f"Calls per run:     {args.calls}")
+    for name, result in (('model + encoder', model_path), ('spliced bytes', spliced_path)):
+        print(f"{name:18} p50 {result['p50_us']:8.1f} us   p99 {result['p99_us']:8.1f} us   "
+              f"peak alloc {result['peak_bytes_per_1000']:>10,} B / 1000 calls")
+    print(f"p50 speedup:       {model_path['p50_us'] / spliced_path['p50_us']:8.1f}x")
+    return {'model': model_path, 'spliced': spliced_path}
+
+if __name__ == "__main__":
+    main()
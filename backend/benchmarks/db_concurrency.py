@@ -0,0 +1,130 @@
+"""
+Assessment Database Concurrency Benchmark
+Throughput and event-loop stall of concurrent assessment writes + reads
+using blocking sync sessions inside coroutines (the previous route code)
+versus the pooled async engine
+
+Run from the backend directory:
+    python -m benchmarks.db_concurrency [--requests 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from database.database import Base, engine_options
+from database.models import Assessment
+
+ASSESSMENT_DATA = {'body_frame': 'vata', 'skin_type': 'pitta', 'appetite': 'kapha'}
+
+def new_assessment(i):
+    return Assessment(
+        session_id=f'bench-{i % 500}',
+        vata_score=40.0,
+        pitta_score=35.0,
+        kapha_score=25.0,
+        dominant_dosha='vata',
+        secondary_dosha='pitta',
+        assessment_data=ASSESSMENT_DATA
+    )
+
+def latest_query(i):
+    return (select(Assessment.dominant_dosha, Assessment.created_at)
+            .where(Assessment.session_id == f'bench-{i % 500}')
+            .order_by(Assessment.created_at.desc())
+            .limit(1))
+
+def blocking_handler(session_factory):
+    async def handle(i):
+        db = session_factory()
+        try:
+            db.add(new_assessment(i))
+            db.commit()
+            db.execute(latest_query(i)).first()
+        finally:
+            db.close()
+    return handle
+
+def async_handler(session_factory):
+    async def handle(i):
+        async with session_factory() as db:
+            db.add(new_assessment(i))
+            await db.commit()
+            (await db.execute(latest_query(i))).first()
+    return handle
+
+async def loop_lag_probe(samples, stop, interval=0.005):
+    """Record how late the event loop wakes a sleeping task"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - expected))
+
+async def run_load(handle, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_samples = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(loop_lag_probe(lag_samples, stop))
+
+    async def one(i):
+        async with semaphore:
+            await handle(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    lag_samples.sort()
+    return {
+        'requests_per_sec': requests / elapsed,
+        'loop_lag_p99_ms': lag_samples[int(len(lag_samples) * 0.99)] * 1000 if lag_samples else 0.0,
+        'loop_lag_max_ms': lag_samples[-1] * 1000 if lag_samples else 0.0
+    }
+
+async def benchmark(requests, concurrency):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        sync_url = f'sqlite:///{path}'
+        async_url = f'sqlite+aiosqlite:///{path}'
+
+        sync_engine = create_engine(sync_url, **engine_options(sync_url))
+        Base.metadata.create_all(bind=sync_engine)
+        async_engine = create_async_engine(async_url, **engine_options(async_url))
+
+        blocking = await run_load(
+            blocking_handler(sessionmaker(bind=sync_engine, autoflush=False)), requests, concurrency
+        )
+        pooled = await run_load(
+            async_handler(async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)),
+            requests, concurrency
+        )
+
+        await async_engine.dispose()
+        sync_engine.dispose()
+    return blocking, pooled
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    blocking, pooled = asyncio.run(benchmark(args.requests, args.concurrency))
+
+    print(f"Requests: {args.requests}   concurrency: {args.concurrency}")
+    for name, result in (('blocking sync', blocking), ('async pooled', pooled)):
+        print(f"{name:14} {result['requests_per_sec']:10,.0f} req/s   "
+              f"loop lag p99 {result['loop_lag_p99_ms']:8.2f} ms   max {result['loop_lag_max_ms']:8.2f} ms")
+    return {'blocking': blocking, 'async': pooled}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+PDF Report Rendering Benchmark
+Reports/sec on one core for the previous renderer (stylesheet, styles and
+every paragraph rebuilt per report) versus render_pdf_report with shared
+templates from utils.report_templates
+
+Run from the backend directory:
+    python -m benchmarks.pdf_render [--reports 300]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab import rl_config
+from reportlab.lib import colors, rl_accel
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+from Training.panchakarma_model import get_panchakarma_recommendations
+from Training.prakritimodel import dosha_results_from_scores
+from utils.simple_pdf_generator import render_pdf_report
+
+SAMPLE_SCORES = [
+    {'vata': 5, 'pitta': 1, 'kapha': 4},
+    {'vata': 2, 'pitta': 7, 'kapha': 1},
+    {'vata': 2, 'pitta': 3, 'kapha': 5},
+]
+
+def render_per_build(user_data, dosha_results, panchakarma_recs):
+    """The renderer before shared templates, kept as the baseline"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    story = []
+    title_style = ParagraphStyle('Title', parent=styles['Heading1'], fontSize=24, spaceAfter=20,
+                                 alignment=1, textColor=colors.darkgreen)
+    story.append(Paragraph("AyurSutra Assessment Report", title_style))
+    story.append(Paragraph("Ayurvedic Wellness Analysis", styles['Heading2']))
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("Your Dosha Results", styles['Heading2']))
+    dosha_data = [
+        ['Dosha', 'Percentage'],
+        ['Vata', f"{dosha_results['percentages']['vata']}%"],
+        ['Pitta', f"{dosha_results['percentages']['pitta']}%"],
+        ['Kapha', f"{dosha_results['percentages']['kapha']}%"]
+    ]
+    dosha_table = Table(dosha_data, colWidths=[2*inch, 2*inch])
+    dosha_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.green),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    story.append(dosha_table)
+    story.append(Spacer(1, 20))
+    if panchakarma_recs and 'therapy_details' in panchakarma_recs:
+        story.append(Paragraph("Recommended Therapies", styles['Heading2']))
+        for therapy in panchakarma_recs['therapy_details']:
+            story.append(Paragraph(f"• {therapy['name']}: {therapy['description']}", styles['Normal']))
+            story.append(Spacer(1, 10))
+    story.append(Spacer(1, 30))
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], fontSize=8,
+                                  textColor=colors.gray, alignment=1)
+    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d')}", footer_style))
+    doc.build(story)
+    return buffer.getvalue()
+
+def reports_per_second(render, samples, reports):
+    started = time.perf_counter()
+    for i in range(reports):
+        render({}, *samples[i % len(samples)])
+    return reports / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reports', type=int, default=300)
+    args = parser.parse_args()
+
+    samples = []
+    for scores in SAMPLE_SCORES:
+        dosha_results = dosha_results_from_scores(scores)
+        samples.append((dosha_results, get_panchakarma_recommendations(dosha_results)))
+
+    # Deterministic output (no timestamps or random IDs) so both paths can be compared byte for byte
+    rl_config.invariant = 1
+    identical = all(render_per_build({}, *sample) == render_pdf_report({}, *sample) for sample in samples)
+
+    before = reports_per_second(render_per_build, samples, args.reports)
+    after = reports_per_second(render_pdf_report, samples, args.reports)
+
+    print(f"Reports per run:   {args.reports}")
+    print(f"Identical output:  {identical}")
+    print(f"C accelerator:     {'yes' if rl_accel._c_funcs else 'no (pip install reportlab[accel])'}")
+    print(f"per-build styles:  {before:10,.1f} reports/s")
+    print(f"shared templates:  {after:10,.1f} reports/s")
+    print(f"Speedup:           {after / before:10.2f}x")
+    return {'identical_output': identical, 'before_reports_per_sec': before, 'after_reports_per_sec': after}
+
+if __name__ == "__main__":
+    main()
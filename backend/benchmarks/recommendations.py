@@ -0,0 +1,48 @@
+"""
+Panchakarma Recommendation Benchmark
+Calls/sec of get_panchakarma_recommendations with the per-key cache versus
+building the recommendation on every call
+
+Run from the backend directory:
+    python -m benchmarks.recommendations [--calls 200000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from Training.panchakarma_model import (
+    build_recommendations, get_panchakarma_recommendations, recommendation_key
+)
+
+SAMPLE_RESULTS = [
+    {'dominant_dosha': 'vata', 'secondary_dosha': 'kapha', 'percentages': {'vata': 50.0, 'pitta': 10.0, 'kapha': 40.0}},
+    {'dominant_dosha': 'pitta', 'secondary_dosha': 'vata', 'percentages': {'vata': 25.0, 'pitta': 60.0, 'kapha': 15.0}},
+    {'dominant_dosha': 'kapha', 'secondary_dosha': 'pitta', 'percentages': {'vata': 20.0, 'pitta': 35.0, 'kapha': 45.0}},
+]
+
+def calls_per_second(fn, calls):
+    samples = len(SAMPLE_RESULTS)
+    started = time.perf_counter()
+    for i in range(calls):
+        fn(SAMPLE_RESULTS[i % samples])
+    return calls / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    uncached = calls_per_second(lambda results: build_recommendations(recommendation_key(results)), args.calls)
+    cached = calls_per_second(get_panchakarma_recommendations, args.calls)
+
+    print(f"Calls per run:     {args.calls}")
+    print(f"uncached build:    {uncached:12,.0f} calls/s")
+    print(f"cached lookup:     {cached:12,.0f} calls/s")
+    print(f"Speedup:           {cached / uncached:12.1f}x")
+    return {'uncached_calls_per_sec': uncached, 'cached_calls_per_sec': cached}
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Chat Session Memory Benchmark
+Compares the per-session footprint of the old free-form dict sessions with
+the slotted ChatSession state
+
+Run from the backend directory:
+    python -m benchmarks.session_memory [--sessions 20000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from routes.chat import (ASSESSMENT_QUESTIONS, OPTION_MAPPING, OPTION_INDEX, new_session,
+                         assessment_data_from_answers)
+from utils.assessment_scoring import score_assessment
+from Training.panchakarma_model import recommendation_key
+
+def _answers(i):
+    """Deterministic, varied option choice per session and question"""
+    return [(i * 7 + q * 3) % len(question['options']) for q, question in enumerate(ASSESSMENT_QUESTIONS)]
+
+def make_dict_session(i):
+    """Session as the chat route used to store it: strings plus full result copies"""
+    assessment_data = {}
+    for q, option_index in enumerate(_answers(i)):
+        question = ASSESSMENT_QUESTIONS[q]
+        option = question['options'][option_index]
+        assessment_data[question['id']] = OPTION_MAPPING[question['id']].get(option, option.lower())
+    dosha_results, panchakarma_recs = score_assessment(assessment_data)
+    return {
+        'assessment_data': assessment_data,
+        'current_question': len(ASSESSMENT_QUESTIONS),
+        'assessment_complete': True,
+        'dosha_results': dosha_results,
+        'panchakarma_recs': panchakarma_recs,
+        'has_sent_welcome': True,
+        'pacing': None
+    }
+
+def make_slotted_session(i):
+    session = new_session()
+    for q, option_index in enumerate(_answers(i)):
+        question = ASSESSMENT_QUESTIONS[q]
+        session.record_answer(q, OPTION_INDEX[q][question['options'][option_index]])
+    session.current_question = len(ASSESSMENT_QUESTIONS)
+    session.has_sent_welcome = True
+    dosha_results, _ = score_assessment(assessment_data_from_answers(session))
+    session.complete(dosha_results, recommendation_key(dosha_results))
+    return session
+
+def measure(factory, count):
+    """Bytes retained per session, measured with tracemalloc"""
+    # Build one session first so module-level caches do not count
+    factory(0)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    sessions = [factory(i) for i in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del sessions
+    return retained / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=20000)
+    args = parser.parse_args()
+
+    dict_bytes = measure(make_dict_session, args.sessions)
+    slotted_bytes = measure(make_slotted_session, args.sessions)
+
+    print(f"Sessions measured: {args.sessions}")
+    print(f"dict session:      {dict_bytes:8.0f} bytes/session")
+    print(f"ChatSession:       {slotted_bytes:8.0f} bytes/session")
+    print(f"Reduction:         {dict_bytes / slotted_bytes:8.1f}x")
+    return {'dict_bytes_per_session': dict_bytes, 'slotted_bytes_per_session': slotted_bytes}
+
+if __name__ == "__main__":
+    main()
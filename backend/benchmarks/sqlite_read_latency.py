@@ -0,0 +1,115 @@
+"""
+SQLite Assessment Read Latency Benchmark
+p50/p99 latency of the get_assessment query (latest row for a session) on a
+large assessments table, comparing the old single-column session_id index
+with the (session_id, created_at) index, with and without the SQLite
+connection profile from database.database
+
+Run from the backend directory:
+    python -m benchmarks.sqlite_read_latency [--rows 1000000] [--rows-per-session 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import bindparam, create_engine, select, text
+
+from database.database import Base, configure_sqlite
+from database.models import Assessment
+
+OLD_INDEX = 'CREATE INDEX ix_assessments_session_id ON assessments (session_id)'
+NEW_INDEX = 'CREATE INDEX ix_assessments_session_id_created_at ON assessments (session_id, created_at)'
+
+LATEST_QUERY = (
+    select(Assessment.dominant_dosha, Assessment.created_at)
+    .where(Assessment.session_id == bindparam('session_id'))
+    .order_by(Assessment.created_at.desc())
+    .limit(1)
+)
+
+def populate(engine, rows, rows_per_session, chunk=50000):
+    sessions = max(1, rows // rows_per_session)
+    started_at = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX IF EXISTS ix_assessments_session_id_created_at'))
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for offset in range(0, rows, chunk):
+            batch = []
+            for i in range(offset, min(offset + chunk, rows)):
+                # Interleave sessions so each one's rows are spread across the table
+                batch.append((f'session_{i % sessions}', 40.0, 35.0, 25.0, 'vata', 'pitta', '{}',
+                              (started_at + timedelta(seconds=i)).isoformat(sep=' ')))
+            cursor.executemany(
+                'INSERT INTO assessments (session_id, vata_score, pitta_score, kapha_score, '
+                'dominant_dosha, secondary_dosha, assessment_data, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                batch
+            )
+        raw.commit()
+    finally:
+        raw.close()
+    return sessions
+
+def set_index(engine, index_sql):
+    with engine.begin() as conn:
+        conn.execute(text('DROP INDEX IF EXISTS ix_assessments_session_id'))
+        conn.execute(text('DROP INDEX IF EXISTS ix_assessments_session_id_created_at'))
+        conn.execute(text(index_sql))
+        conn.execute(text('ANALYZE'))
+
+def measure(engine, sessions, queries):
+    rng = random.Random(42)
+    latencies = []
+    with engine.connect() as conn:
+        for _ in range(queries):
+            session_id = f'session_{rng.randrange(sessions)}'
+            started = time.perf_counter()
+            conn.execute(LATEST_QUERY, {'session_id': session_id}).first()
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--rows-per-session', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        plain = create_engine(url)
+        tuned = configure_sqlite(create_engine(url))
+        Base.metadata.create_all(bind=tuned)
+
+        started = time.perf_counter()
+        sessions = populate(tuned, args.rows, args.rows_per_session)
+        print(f"Inserted {args.rows:,} rows for {sessions:,} sessions in {time.perf_counter() - started:.1f}s")
+
+        set_index(tuned, OLD_INDEX)
+        results['session_id index'] = measure(plain, sessions, args.queries)
+        results['session_id index + profile'] = measure(tuned, sessions, args.queries)
+        set_index(tuned, NEW_INDEX)
+        results['composite index'] = measure(plain, sessions, args.queries)
+        results['composite index + profile'] = measure(tuned, sessions, args.queries)
+
+        plain.dispose()
+        tuned.dispose()
+
+    for name, result in results.items():
+        print(f"{name:28} p50 {result['p50_us']:8.1f} us   p99 {result['p99_us']:8.1f} us")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+Backend Micro-benchmark Suite
+Times every hot function of the chat, assessment and report paths on
+seeded synthetic data and writes the results as JSON, so runs on different
+commits can be compared. Runs offline; nothing is downloaded.
+
+Covered: clean_text, match_intent, extract_dosha_keywords,
+chatbot_model.predict, calculate_dosha_scores,
+get_panchakarma_recommendations, generate_pdf_report and Assessment
+insert/select against SQLite at each --rows size.
+
+Every result has `us_per_call` (median over rounds), which is what
+--compare uses. NLP caches are cleared at the start of every round, so a
+round measures a fresh message stream with production-like repetition
+rather than a fully warmed cache (clean_text.warm covers the latter).
+
+Run from the backend directory:
+    python -m benchmarks.suite [--quick] [--rows 10000,1000000] [--only nlp,assessment_db]
+                               [--output results.json] [--compare baseline.json [--fail-on-regression]]
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, insert
+
+from benchmarks import synthetic
+from benchmarks.sqlite_read_latency import LATEST_QUERY
+from database.database import Base, configure_sqlite
+from database.models import Assessment
+from Training.botmodel import load_intents
+from Training.panchakarma_model import build_recommendations, get_panchakarma_recommendations, recommendation_key
+from Training.prakritimodel import calculate_dosha_scores
+from utils import nlp_processor
+from utils.nlp_processor import clean_text, extract_dosha_keywords, match_intent
+from utils.simple_pdf_generator import render_pdf_report, save_pdf_report
+
+BACKEND_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..'))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+CHATBOT_MODEL_PATH = os.path.join(BACKEND_DIR, 'Models', 'chatbot_model.pkl')
+
+def time_rounds(fn, inputs, rounds, before_round=None):
+    """
+    Call fn on every input, `rounds` times
+
+    Returns:
+        Dictionary with median/min microseconds per call and calls/sec
+    """
+    per_call = []
+    for _ in range(rounds):
+        if before_round is not None:
+            before_round()
+        started = time.perf_counter()
+        for item in inputs:
+            fn(item)
+        per_call.append((time.perf_counter() - started) / len(inputs))
+    median = statistics.median(per_call)
+    return {
+        'us_per_call': median * 1e6,
+        'us_per_call_min': min(per_call) * 1e6,
+        'ops_per_sec': 1 / median,
+        'rounds': rounds,
+        'calls_per_round': len(inputs)
+    }
+
+def latency_percentiles(latencies):
+    latencies = sorted(latencies)
+    return {
+        'us_per_call': statistics.median(latencies) * 1e6,
+        'p50_us': latencies[len(latencies) // 2] * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'ops_per_sec': len(latencies) / sum(latencies),
+        'calls': len(latencies)
+    }
+
+def bench_nlp(config):
+    messages = synthetic.chat_messages(config['messages'])
+    intents = load_intents()['intents']
+    rounds = config['rounds']
+    clear = nlp_processor.clear_caches
+
+    nlp_processor.warmup()
+    match_intent(messages[0], intents)  # build the intent index outside the timings
+    results = {
+        'clean_text': time_rounds(clean_text, messages, rounds, before_round=clear),
+        'match_intent': time_rounds(lambda text: match_intent(text, intents), messages, rounds, before_round=clear),
+        'extract_dosha_keywords': time_rounds(extract_dosha_keywords, messages, rounds, before_round=clear),
+    }
+    # Only as many distinct inputs as the cache holds, so every call is a hit
+    warm = messages[:nlp_processor.CLEAN_TEXT_CACHE_SIZE]
+    for text in warm:
+        clean_text(text)
+    results['clean_text.warm'] = time_rounds(clean_text, warm, rounds)
+    return results
+
+def bench_chatbot_model(config):
+    with open(CHATBOT_MODEL_PATH, 'rb') as f:
+        model = pickle.load(f)
+    # The intent batcher feeds the model cleaned text
+    cleaned = [clean_text(text) for text in synthetic.chat_messages(config['messages'])]
+    rounds = config['rounds']
+    batches = [cleaned[i:i + 64] for i in range(0, len(cleaned), 64)]
+
+    batched = time_rounds(model.predict, batches, rounds)
+    messages_per_batch = len(cleaned) / len(batches)
+    batched['us_per_call'] /= messages_per_batch
+    batched['us_per_call_min'] /= messages_per_batch
+    batched['ops_per_sec'] *= messages_per_batch
+    return {
+        'chatbot_model.predict': time_rounds(lambda text: model.predict([text]), cleaned[:config['single_predictions']], rounds),
+        # Per message, as the micro-batcher calls it under load
+        'chatbot_model.predict.batch64': batched
+    }
+
+def bench_scoring(config):
+    answers = synthetic.assessment_answers(config['assessments'])
+    dosha_results = [calculate_dosha_scores(answer) for answer in answers]
+    rounds = config['rounds']
+    return {
+        'calculate_dosha_scores': time_rounds(calculate_dosha_scores, answers, rounds),
+        'get_panchakarma_recommendations': time_rounds(get_panchakarma_recommendations, dosha_results, rounds),
+        'get_panchakarma_recommendations.uncached': time_rounds(
+            lambda results: build_recommendations(recommendation_key(results)), dosha_results, rounds
+        )
+    }
+
+def bench_pdf(config):
+    count = config['reports']
+    reports = [
+        (user, results, get_panchakarma_recommendations(results))
+        for user, results in zip(synthetic.user_data(count), synthetic.dosha_results(count))
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        # generate_pdf_report is render + save into REPORTS_DIR; save into a
+        # scratch directory instead so runs leave nothing behind
+        generate = lambda report: save_pdf_report(render_pdf_report(*report), reports_dir=tmp)
+        generate(reports[0])
+        result = time_rounds(generate, reports, config['pdf_rounds'])
+        sizes = [os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)]
+    result['avg_bytes'] = sum(sizes) / len(sizes)
+    return {'generate_pdf_report': result}
+
+def load_assessments(engine, rows, chunk=50000):
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        pending = []
+        for row in synthetic.assessment_rows(rows):
+            pending.append(row)
+            if len(pending) == chunk:
+                _insert_raw(cursor, pending)
+                pending = []
+        if pending:
+            _insert_raw(cursor, pending)
+        raw.commit()
+    finally:
+        raw.close()
+
+def _insert_raw(cursor, rows):
+    cursor.executemany(
+        'INSERT INTO assessments (session_id, vata_score, pitta_score, kapha_score, '
+        'dominant_dosha, secondary_dosha, assessment_data, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        rows
+    )
+
+def assessment_values(count, offset):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        {
+            'session_id': f'bench_insert_{offset + i}', 'vata_score': 40.0, 'pitta_score': 35.0,
+            'kapha_score': 25.0, 'dominant_dosha': 'vata', 'secondary_dosha': 'pitta',
+            'assessment_data': {'source': 'benchmark'}, 'created_at': now
+        }
+        for i in range(count)
+    ]
+
+def bench_assessment_db(config):
+    results = {}
+    for rows in config['rows']:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = configure_sqlite(create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}"))
+            Base.metadata.create_all(bind=engine)
+
+            started = time.perf_counter()
+            load_assessments(engine, rows)
+            load_seconds = time.perf_counter() - started
+            prefix = f'assessment_db.{rows}'
+
+            # One row per transaction, as a request without write-behind does
+            latencies = []
+            for values in assessment_values(config['single_inserts'], 0):
+                started = time.perf_counter()
+                with engine.begin() as conn:
+                    conn.execute(insert(Assessment), [values])
+                latencies.append(time.perf_counter() - started)
+            results[f'{prefix}.insert_single'] = latency_percentiles(latencies)
+
+            # executemany batches, as the write-behind flush does
+            batches = [assessment_values(500, config['single_inserts'] + i * 500) for i in range(config['insert_batches'])]
+            def insert_batch(batch):
+                with engine.begin() as conn:
+                    conn.execute(insert(Assessment), batch)
+            batch_result = time_rounds(insert_batch, batches, 1)
+            for key in ('us_per_call', 'us_per_call_min'):
+                batch_result[key] /= 500
+            batch_result['ops_per_sec'] *= 500
+            batch_result['rows_per_batch'] = 500
+            results[f'{prefix}.insert_batch'] = batch_result
+
+            sessions = max(1, rows // 10)
+            session_ids = [f'session_{(i * 7919) % sessions}' for i in range(config['selects'])]
+            latencies = []
+            with engine.connect() as conn:
+                for session_id in session_ids:
+                    started = time.perf_counter()
+                    conn.execute(LATEST_QUERY, {'session_id': session_id}).first()
+                    latencies.append(time.perf_counter() - started)
+            results[f'{prefix}.select_latest'] = latency_percentiles(latencies)
+            results[f'{prefix}.select_latest']['load_seconds'] = load_seconds
+            engine.dispose()
+    return results
+
+BENCHMARKS = {
+    'nlp': bench_nlp,
+    'chatbot_model': bench_chatbot_model,
+    'scoring': bench_scoring,
+    'pdf': bench_pdf,
+    'assessment_db': bench_assessment_db,
+}
+
+def suite_config(args):
+    quick = args.quick
+    return {
+        'messages': 2000 if quick else 10000,
+        'single_predictions': 200 if quick else 2000,
+        'assessments': 2000 if quick else 20000,
+        'rounds': 3 if quick else 7,
+        'reports': 10 if quick else 50,
+        'pdf_rounds': 1 if quick else 3,
+        'rows': [int(rows) for rows in (args.rows or ('10000' if quick else '10000,1000000')).split(',')],
+        'single_inserts': 200 if quick else 2000,
+        'insert_batches': 4 if quick else 20,
+        'selects': 2000 if quick else 20000,
+    }
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+def environment():
+    import numpy, reportlab, sklearn, sqlalchemy
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD') or None,
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': {
+            'numpy': numpy.__version__,
+            'reportlab': reportlab.Version,
+            'scikit-learn': sklearn.__version__,
+            'sqlalchemy': sqlalchemy.__version__,
+        }
+    }
+
+def compare(results, baseline, threshold):
+    """
+    Print per-benchmark change in us_per_call against a baseline run
+
+    Returns:
+        Names of benchmarks slower than the baseline by more than threshold
+    """
+    regressions = []
+    print(f"\n{'benchmark':52} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = result['us_per_call'] / previous['us_per_call']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        print(f"{name:52} {previous['us_per_call']:12.2f} {result['us_per_call']:12.2f} {ratio - 1:+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help='smaller inputs and 10k rows only, for a smoke run')
+    parser.add_argument('--rows', help='comma-separated assessments table sizes (default 10000,1000000)')
+    parser.add_argument('--only', help='comma-separated benchmark groups: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 if --compare finds a regression')
+    args = parser.parse_args()
+
+    groups = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [group for group in groups if group not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(unknown)}")
+
+    config = suite_config(args)
+    env = environment()
+    results = {}
+    for group in groups:
+        started = time.perf_counter()
+        group_results = BENCHMARKS[group](config)
+        results.update(group_results)
+        print(f"{group} ({time.perf_counter() - started:.1f}s)")
+        for name, result in group_results.items():
+            print(f"  {name:50} {result['us_per_call']:12.2f} us/call {result['ops_per_sec']:14,.0f} ops/s")
+
+    output = args.output
+    if output is None:
+        name = (env['commit'] or 'local') + ('-dirty' if env['dirty'] else '')
+        output = os.path.join(RESULTS_DIR, f'{name}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'environment': env, 'config': config, 'results': results}, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != config:
+            print("Warning: baseline was run with a different configuration; timings may not be comparable")
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Synthetic Benchmark Data
+Seeded generators for the inputs the backend's hot functions see in
+production: chat messages, assessment answers, dosha results, user data and
+assessments table rows. The same seed always yields the same data, so
+benchmark runs on different commits are comparable.
+"""
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from Training.botmodel import load_intents
+from Training.prakritimodel import DOSHA_QUESTIONS, calculate_dosha_scores
+
+DEFAULT_SEED = 1234
+
+FILLER_WORDS = [
+    'please', 'really', 'today', 'usually', 'my', 'feel', 'very', 'lately', 'after', 'meals',
+    'morning', 'evening', 'always', 'sometimes', 'body', 'mind', 'treatment', 'doctor', 'routine'
+]
+DOSHA_WORDS = [
+    'thin', 'light', 'dry', 'cold', 'anxious', 'warm', 'oily', 'sharp', 'intense', 'heavy',
+    'thick', 'smooth', 'slow', 'calm', 'stable', 'digestion', 'sleep', 'stress', 'skin', 'hair'
+]
+BUTTON_MESSAGES = ['start', 'yes', 'no', 'Thin and light', 'Medium build', 'Heavy and large', 'Normal']
+
+def chat_messages(count, seed=DEFAULT_SEED):
+    """
+    Chat inputs: a mix of intent patterns with noise, free text about
+    symptoms and repeated button labels, in roughly production proportions
+
+    Returns:
+        List of strings
+    """
+    rng = random.Random(seed)
+    patterns = [pattern for intent in load_intents()['intents'] for pattern in intent['patterns']]
+    messages = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            words = rng.choice(patterns).split()
+            words.insert(rng.randrange(len(words) + 1), rng.choice(FILLER_WORDS))
+            text = ' '.join(words)
+        elif kind < 0.8:
+            words = rng.choices(FILLER_WORDS + DOSHA_WORDS, k=rng.randint(4, 16))
+            text = ' '.join(words).capitalize() + rng.choice(['.', '!', '?', ', thanks'])
+        else:
+            text = rng.choice(BUTTON_MESSAGES)
+        messages.append(text)
+    return messages
+
+def assessment_answers(count, seed=DEFAULT_SEED, complete_fraction=0.9):
+    """
+    Assessment answer dicts over the scoring questions; most are complete,
+    the rest skip questions or carry unknown answers
+
+    Returns:
+        List of {question_id: answer} dicts
+    """
+    rng = random.Random(seed)
+    options = {}
+    for questions in DOSHA_QUESTIONS.values():
+        for question, weights in questions.items():
+            options.setdefault(question, set()).update(weights)
+    options = {question: sorted(answers) for question, answers in options.items()}
+
+    answers = []
+    for _ in range(count):
+        answer = {question: rng.choice(choices) for question, choices in options.items()}
+        if rng.random() >= complete_fraction:
+            for question in rng.sample(sorted(answer), rng.randint(1, 3)):
+                if rng.random() < 0.5:
+                    del answer[question]
+                else:
+                    answer[question] = 'unsure'
+        answers.append(answer)
+    return answers
+
+def dosha_results(count, seed=DEFAULT_SEED):
+    """Dosha results as produced by calculate_dosha_scores for synthetic answers"""
+    return [calculate_dosha_scores(answer) for answer in assessment_answers(count, seed)]
+
+def user_data(count, seed=DEFAULT_SEED):
+    """PDF report user data: session id plus the raw assessment answers"""
+    return [
+        {'session_id': f'bench_{seed}_{i}', 'assessment_data': answer}
+        for i, answer in enumerate(assessment_answers(count, seed))
+    ]
+
+def assessment_rows(count, rows_per_session=10, seed=DEFAULT_SEED):
+    """
+    Rows for the assessments table with sessions interleaved across the table
+
+    Yields:
+        (session_id, vata, pitta, kapha, dominant, secondary, responses_json, created_at) tuples
+    """
+    rng = random.Random(seed)
+    sessions = max(1, count // rows_per_session)
+    started_at = datetime(2024, 1, 1)
+    for i in range(count):
+        vata, pitta = rng.uniform(0, 60), rng.uniform(0, 40)
+        kapha = max(0.0, 100.0 - vata - pitta)
+        ranked = sorted((('vata', vata), ('pitta', pitta), ('kapha', kapha)), key=lambda item: item[1], reverse=True)
+        yield (
+            f'session_{i % sessions}', round(vata, 2), round(pitta, 2), round(kapha, 2),
+            ranked[0][0], ranked[1][0], json.dumps({'source': 'benchmark'}),
+            (started_at + timedelta(seconds=i)).isoformat(sep=' ')
+        )
@@ -0,0 +1,412 @@
+"""
+WebSocket Chat Load Test
+Drives N simulated clients through full /ws/chat conversations (welcome,
+"start", an answer to each of the ASSESSMENT_QUESTIONS, then free-text chat)
+and reports turn latency percentiles, messages/sec, event-loop lag and RSS
+over time
+
+By default the app is served in-process by uvicorn on its own thread (and
+event loop) with a scratch SQLite database, so the server loop's lag and the
+process RSS can be sampled directly; the clients share the process, so
+treat capacity numbers from this mode as a lower bound. For capacity runs
+start the server separately and pass --url (and --pid for its RSS).
+
+Soak mode (--soak 4h) keeps every client looping over new conversations for
+the given duration and reports the RSS growth rate so leaks show up.
+
+Run from the backend directory:
+    python -m benchmarks.ws_load [--clients 50] [--conversations 1] [--free-text 3] [--think-ms 0]
+                                 [--pacing off] [--url ws://127.0.0.1:8000/ws/chat --pid 1234]
+                                 [--soak 4h] [--report-interval 10] [--output load.json]
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from websockets.asyncio.client import connect
+
+from benchmarks import synthetic
+from utils.pacing import PACING_MODES
+
+START_WORDS = ('start', 'begin', 'yes', 'ready', "let's start", "let's begin")
+
+class LatencyRecorder:
+    """
+    Log-bucketed latency counts (1% resolution) for percentiles in constant
+    memory, so hours-long soak runs don't grow the harness itself
+    """
+
+    GROWTH = math.log(1.01)
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.total = 0
+        self.max = 0.0
+
+    def record(self, seconds):
+        # floor, not int(): logs of sub-second latencies are negative
+        self.counts[math.floor(math.log(max(seconds, 1e-6)) / self.GROWTH)] += 1
+        self.total += 1
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        if not self.total:
+            return None
+        target = fraction * self.total
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= target:
+                # Upper bucket edge, which can lie above the largest sample
+                return min(math.exp((bucket + 1) * self.GROWTH), self.max)
+        return self.max
+
+    def summary(self):
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+        return {
+            'count': self.total,
+            'p50_ms': ms(self.percentile(0.50)),
+            'p90_ms': ms(self.percentile(0.90)),
+            'p99_ms': ms(self.percentile(0.99)),
+            'p999_ms': ms(self.percentile(0.999)),
+            'max_ms': ms(self.max if self.total else None)
+        }
+
+class LoadStats:
+    def __init__(self):
+        self.turns = collections.defaultdict(LatencyRecorder)  # turn kind -> latencies
+        self.interval = LatencyRecorder()
+        self.turn_count = 0
+        self.frames = 0
+        self.conversations = 0
+        self.retries = 0
+        self.errors = collections.Counter()
+        self.active_clients = 0
+
+    def record_turn(self, kind, seconds):
+        self.turns[kind].record(seconds)
+        self.interval.record(seconds)
+        self.turn_count += 1
+
+    def take_interval(self):
+        interval, self.interval = self.interval, LatencyRecorder()
+        return interval
+
+    def overall(self):
+        overall = LatencyRecorder()
+        for recorder in self.turns.values():
+            overall.merge(recorder)
+        return overall
+
+def rss_bytes(pid='self'):
+    """Resident set size from /proc, or None where that isn't available"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def loop_lag_probe(samples, stop, interval=0.01):
+    """
+    Coroutine recording how late the running loop wakes a sleeping task
+
+    Samples go to a deque so another thread can drain them safely.
+    """
+    async def probe():
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            samples.append(max(0.0, time.perf_counter() - expected))
+    return probe()
+
+def drain(samples):
+    recorder = LatencyRecorder()
+    while samples:
+        recorder.record(samples.popleft())
+    return recorder
+
+class InProcessServer:
+    """The app served by uvicorn on a background thread with its own event loop"""
+
+    def __init__(self):
+        import uvicorn
+        from app import app
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=self.port, log_level='warning'))
+        self.loop = None
+        self.lag_samples = collections.deque()
+        self._stop_probe = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='load-test-server', daemon=True)
+
+    @property
+    def url(self):
+        return f'ws://127.0.0.1:{self.port}/ws/chat'
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.create_task(loop_lag_probe(self.lag_samples, self._stop_probe))
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self, timeout=60):
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("In-process server failed to start")
+            time.sleep(0.05)
+
+    def stop(self):
+        self._stop_probe.set()
+        self.server.should_exit = True
+        self._thread.join(timeout=30)
+
+async def receive_reply(ws, stats, timeout):
+    """Next non-typing frame from the server"""
+    while True:
+        message = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+        stats.frames += 1
+        if message.get('type') != 'typing':
+            return message
+
+async def turn(ws, text, kind, stats, timeout):
+    started = time.perf_counter()
+    await ws.send(json.dumps({'message': text}))
+    stats.frames += 1
+    reply = await receive_reply(ws, stats, timeout)
+    stats.record_turn(kind, time.perf_counter() - started)
+    return reply
+
+async def conversation(url, session_id, args, free_texts, rng, stats):
+    async def think():
+        if args.think_ms:
+            await asyncio.sleep(args.think_ms / 1000 * rng.uniform(0.5, 1.5))
+
+    started = time.perf_counter()
+    async with connect(f'{url}?session_id={session_id}&pacing={args.pacing}', max_size=None) as ws:
+        await receive_reply(ws, stats, args.turn_timeout)
+        stats.record_turn('welcome', time.perf_counter() - started)
+
+        await think()
+        reply = await turn(ws, 'start', 'start', stats, args.turn_timeout)
+        while reply.get('type') == 'question':
+            answer = rng.choice(reply['options'])
+            await think()
+            reply = await turn(ws, answer, 'answer', stats, args.turn_timeout)
+            while reply.get('type') == 'message':
+                # Scoring executor was saturated; the server asks for the answer again
+                stats.retries += 1
+                await asyncio.sleep(0.1)
+                reply = await turn(ws, answer, 'answer', stats, args.turn_timeout)
+        if reply.get('type') != 'assessment_complete':
+            raise RuntimeError(f"unexpected reply {reply.get('type')!r} during assessment")
+
+        for _ in range(args.free_text):
+            await think()
+            await turn(ws, rng.choice(free_texts), 'free_text', stats, args.turn_timeout)
+    stats.conversations += 1
+
+async def client(client_id, url, args, free_texts, stats, deadline):
+    rng = random.Random(client_id)
+    await asyncio.sleep(args.ramp_seconds * client_id / max(1, args.clients))
+    stats.active_clients += 1
+    try:
+        number = 0
+        while True:
+            if deadline is None and number >= args.conversations:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                await conversation(url, f'load_{client_id}_{number}', args, free_texts, rng, stats)
+            except Exception as e:
+                stats.errors[type(e).__name__] += 1
+                await asyncio.sleep(1)
+            number += 1
+    finally:
+        stats.active_clients -= 1
+
+def rss_growth_mb_per_hour(timeline):
+    """Least-squares RSS slope over the second half of the run"""
+    points = [(entry['elapsed_s'], entry['rss_mb']) for entry in timeline if entry['rss_mb'] is not None]
+    points = points[len(points) // 2:]
+    if len(points) < 3:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_r = sum(r for _, r in points) / len(points)
+    variance = sum((t - mean_t) ** 2 for t, _ in points)
+    if not variance:
+        return None
+    slope = sum((t - mean_t) * (r - mean_r) for t, r in points) / variance
+    return slope * 3600
+
+async def report(stats, server_lag, client_lag, rss_pid, interval, timeline, started, done):
+    last_turns, last_frames, last_time = 0, 0, time.perf_counter()
+    print(f"{'elapsed':>8} {'clients':>7} {'turns/s':>8} {'msgs/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'srv lag p99':>11} {'srv lag max':>11} {'cli lag max':>11} {'rss MB':>8} {'errors':>6}")
+    while True:
+        try:
+            await asyncio.wait_for(done.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        now = time.perf_counter()
+        elapsed = now - last_time
+        latencies = stats.take_interval()
+        server = drain(server_lag) if server_lag is not None else None
+        client_side = drain(client_lag)
+        rss = rss_bytes(rss_pid) if rss_pid is not None else None
+        entry = {
+            'elapsed_s': round(now - started, 1),
+            'clients': stats.active_clients,
+            'turns_per_sec': (stats.turn_count - last_turns) / elapsed,
+            'messages_per_sec': (stats.frames - last_frames) / elapsed,
+            'turn_p50_ms': latencies.summary()['p50_ms'],
+            'turn_p99_ms': latencies.summary()['p99_ms'],
+            'server_loop_lag_p99_ms': server.summary()['p99_ms'] if server else None,
+            'server_loop_lag_max_ms': server.summary()['max_ms'] if server else None,
+            'client_loop_lag_max_ms': client_side.summary()['max_ms'],
+            'rss_mb': rss / 2 ** 20 if rss is not None else None,
+            'errors': sum(stats.errors.values())
+        }
+        timeline.append(entry)
+        last_turns, last_frames, last_time = stats.turn_count, stats.frames, now
+
+        def cell(value, fmt):
+            return format(value, fmt) if value is not None else '-'
+        print(f"{entry['elapsed_s']:8.1f} {entry['clients']:7d} {entry['turns_per_sec']:8.1f} "
+              f"{entry['messages_per_sec']:8.1f} {cell(entry['turn_p50_ms'], '8.2f')} {cell(entry['turn_p99_ms'], '8.2f')} "
+              f"{cell(entry['server_loop_lag_p99_ms'], '11.2f')} {cell(entry['server_loop_lag_max_ms'], '11.2f')} "
+              f"{cell(entry['client_loop_lag_max_ms'], '11.2f')} {cell(entry['rss_mb'], '8.1f')} {entry['errors']:6d}")
+        if done.is_set():
+            return
+
+async def run_load(url, args, server_lag, rss_pid):
+    free_texts = [text for text in synthetic.chat_messages(1000) if text.lower() not in START_WORDS]
+    stats = LoadStats()
+    timeline = []
+    client_lag = collections.deque()
+    stop_probe = threading.Event()
+    probe = asyncio.create_task(loop_lag_probe(client_lag, stop_probe))
+    done = asyncio.Event()
+    started = time.perf_counter()
+    reporter = asyncio.create_task(
+        report(stats, server_lag, client_lag, rss_pid, args.report_interval, timeline, started, done)
+    )
+
+    deadline = time.monotonic() + args.soak if args.soak else None
+    await asyncio.gather(*(client(i, url, args, free_texts, stats, deadline) for i in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await reporter
+    stop_probe.set()
+    await probe
+
+    overall = stats.overall()
+    return {
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'elapsed_s': elapsed,
+        'conversations': stats.conversations,
+        'turns': stats.turn_count,
+        'turns_per_sec': stats.turn_count / elapsed,
+        'messages_per_sec': stats.frames / elapsed,
+        'retries': stats.retries,
+        'errors': dict(stats.errors),
+        'turn_latency': overall.summary(),
+        'turn_latency_by_kind': {kind: recorder.summary() for kind, recorder in stats.turns.items()},
+        'rss_mb': {
+            'start': timeline[0]['rss_mb'] if timeline else None,
+            'end': timeline[-1]['rss_mb'] if timeline else None,
+            'peak': max((entry['rss_mb'] for entry in timeline if entry['rss_mb'] is not None), default=None),
+            'growth_mb_per_hour': rss_growth_mb_per_hour(timeline)
+        },
+        'timeline': timeline
+    }
+
+def parse_duration(value):
+    """Seconds from '90', '90s', '30m' or '4h'"""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--conversations', type=int, default=1, help='conversations per client (ignored with --soak)')
+    parser.add_argument('--free-text', type=int, default=3, help='free-text turns after the assessment')
+    parser.add_argument('--think-ms', type=float, default=0, help='mean pause before each message (+/-50%%)')
+    parser.add_argument('--ramp-seconds', type=float, default=2, help='spread client start-up over this long')
+    parser.add_argument('--pacing', choices=PACING_MODES, default='off', help='server reply pacing per session')
+    parser.add_argument('--turn-timeout', type=float, default=30)
+    parser.add_argument('--url', help='target an already running server instead of an in-process one')
+    parser.add_argument('--pid', type=int, help='server process to sample RSS from with --url')
+    parser.add_argument('--soak', type=parse_duration, help="run conversations continuously for a duration, e.g. '4h'")
+    parser.add_argument('--report-interval', type=float, default=10)
+    parser.add_argument('--max-rss-growth', type=float, help='exit 1 if RSS grows faster than this many MB/hour')
+    parser.add_argument('--output', help='write the summary and timeline as JSON')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url, server_lag, rss_pid = args.url, None, args.pid
+    else:
+        # Keep the load test's writes and logs out of the development setup
+        scratch = tempfile.TemporaryDirectory()
+        os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(scratch.name, 'load.db')}")
+        os.environ.setdefault('LOG_LEVEL', 'WARNING')
+        server = InProcessServer()
+        server.start()
+        url, server_lag, rss_pid = server.url, server.lag_samples, 'self'
+
+    try:
+        results = asyncio.run(run_load(url, args, server_lag, rss_pid))
+    finally:
+        if server is not None:
+            server.stop()
+            scratch.cleanup()
+
+    latency = results['turn_latency']
+    print(f"\nConversations: {results['conversations']}   turns: {results['turns']}   "
+          f"errors: {sum(results['errors'].values())}   retries: {results['retries']}")
+    print(f"Throughput:    {results['turns_per_sec']:.1f} turns/s   {results['messages_per_sec']:.1f} msgs/s")
+    print(f"Turn latency:  p50 {latency['p50_ms']} ms   p99 {latency['p99_ms']} ms   max {latency['max_ms']} ms")
+    for kind, summary in results['turn_latency_by_kind'].items():
+        print(f"  {kind:10} p50 {summary['p50_ms']:>9} ms   p99 {summary['p99_ms']:>9} ms   ({summary['count']} turns)")
+    rss = results['rss_mb']
+    if rss['end'] is not None:
+        growth = rss['growth_mb_per_hour']
+        print(f"RSS:           start {rss['start']:.1f} MB   end {rss['end']:.1f} MB   peak {rss['peak']:.1f} MB"
+              + (f"   growth {growth:+.1f} MB/h" if growth is not None else ''))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.max_rss_growth is not None and (rss['growth_mb_per_hour'] or 0) > args.max_rss_growth:
+        print(f"RSS growth exceeds {args.max_rss_growth} MB/h")
+        sys.exit(1)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Lightweight schema migrations
+Brings databases created by older versions up to date with models.py;
+create_all only creates missing tables, never missing columns or indexes
+"""
+from sqlalchemy import inspect, text
+from database.database import Base
+
+def add_missing_columns(engine):
+    """ALTER TABLE ... ADD COLUMN for model columns absent from existing tables"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+# Indexes made redundant by a newer composite index (table -> index names)
+OBSOLETE_INDEXES = {
+    'assessments': ['ix_assessments_session_id'],  # covered by (session_id, created_at)
+}
+
+def create_missing_indexes(engine):
+    """CREATE INDEX for model indexes absent from existing tables"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+def drop_index_sql(dialect_name, table_name, index_name):
+    """DROP INDEX statement for a dialect; MySQL scopes index names to their table"""
+    if dialect_name in ('mysql', 'mariadb'):
+        return f'DROP INDEX {index_name} ON {table_name}'
+    return f'DROP INDEX {index_name}'
+
+def drop_obsolete_indexes(engine):
+    """DROP INDEX for indexes listed in OBSOLETE_INDEXES"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table_name, index_names in OBSOLETE_INDEXES.items():
+            if table_name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table_name)}
+            for index_name in index_names:
+                if index_name in existing_indexes:
+                    conn.execute(text(drop_index_sql(engine.dialect.name, table_name, index_name)))
+
+def run_migrations(engine):
+    """Apply all migrations; safe to run on every startup"""
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    drop_obsolete_indexes(engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Index
 from sqlalchemy.sql import func
 from database.database import Base
 
@@ -7,14 +7,19 @@ class UserSession(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, unique=True, index=True)
+    data = Column(JSON)  # Chat session state, see utils.session_store
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        # Latest assessment per session: WHERE session_id = ? ORDER BY created_at DESC
+        Index("ix_assessments_session_id_created_at", "session_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, index=True)
+    session_id = Column(String)
     vata_score = Column(Float)
     pitta_score = Column(Float)
     kapha_score = Column(Float)
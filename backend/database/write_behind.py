@@ -0,0 +1,318 @@
+"""
+Write-Behind Persistence
+Buffers Assessment and ChatMessage inserts in memory and writes them in bulk
+(one executemany per table per flush) when a batch fills up or the flush
+interval passes, instead of a commit round trip per row
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from database.database import async_engine, engine as sync_engine
+from database.models import Assessment, ChatMessage
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', '500'))
+WRITE_BEHIND_FLUSH_INTERVAL_SECONDS = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL_SECONDS', '0.5'))
+# Rows queued per table beyond this are dropped (and counted) while the
+# database is failing; per table so chat traffic cannot crowd out assessments
+WRITE_BEHIND_MAX_QUEUE = int(os.getenv('WRITE_BEHIND_MAX_QUEUE', '100000'))
+# Failed flushes in a row before batches are split to isolate bad rows
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv('WRITE_BEHIND_MAX_ATTEMPTS', '3'))
+WRITE_BEHIND_DEAD_LETTER_PATH = os.getenv('WRITE_BEHIND_DEAD_LETTER_PATH', './write_behind_dead_letter.jsonl')
+
+DB_COMMIT_SECONDS = stage('db_commit')
+
+def _now():
+    # Naive UTC, matching SQLite's CURRENT_TIMESTAMP server default
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class WriteBehindQueue:
+    """
+    In-memory insert buffer flushed by a background task
+
+    Rows get their timestamp when queued, so ordering by created_at is the
+    same as with immediate inserts. A batch being written stays visible to
+    has_pending/latest_pending until its transaction finishes, so readers
+    never fall between the queue and the table. Rows from a failed flush
+    are put back at the front of the queue and retried on the next flush.
+    After max_attempts failures in a row the batch is written in bisected
+    transactions, and rows that fail on their own (rather than because the
+    database is unavailable) go to the dead-letter file. Without a running
+    flusher (scripts, tests) rows are inserted immediately.
+    """
+
+    def __init__(self, engine=async_engine, sync_engine=sync_engine, batch_size=WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval=WRITE_BEHIND_FLUSH_INTERVAL_SECONDS, max_queue=WRITE_BEHIND_MAX_QUEUE,
+                 max_attempts=WRITE_BEHIND_MAX_ATTEMPTS, dead_letter_path=WRITE_BEHIND_DEAD_LETTER_PATH):
+        self.engine = engine
+        self.sync_engine = sync_engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+        self._pending = defaultdict(list)  # model -> [row dicts]
+        self._pending_sessions = defaultdict(set)  # model -> session ids with queued rows
+        # Batch being written by the current flush; still visible to readers
+        # until its transaction commits or the rows are requeued
+        self._inflight = {}
+        self._inflight_sessions = {}
+        self._flush_lock = None
+        self._wakeup = None
+        self._task = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    @property
+    def depth(self):
+        return sum(len(rows) for rows in self._pending.values())
+
+    def add(self, model, row):
+        """
+        Queue a row (column -> value) for insertion into model's table
+
+        Returns:
+            True if the row was accepted; False if it was dropped because
+            model's queue is full (or, without a flusher, dead-lettered)
+        """
+        if self._task is None:
+            return self._insert_now(model, row)
+        if len(self._pending[model]) >= self.max_queue:
+            if not self.dropped:
+                logger.error("Write-behind queue full; dropping rows",
+                             extra={'table': model.__tablename__, 'max_queue': self.max_queue})
+            self.dropped += 1
+            return False
+        self._pending[model].append(row)
+        if 'session_id' in row:
+            self._pending_sessions[model].add(row['session_id'])
+        self.enqueued += 1
+        if self.depth >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _insert_now(self, model, row):
+        # No flusher to hand the row to; a blocking insert beats losing it
+        try:
+            with self.sync_engine.begin() as conn:
+                conn.execute(insert(model), [row])
+        except OperationalError:
+            # The database itself is failing, not this row; let the caller see it
+            raise
+        except Exception as e:
+            self._dead_letter(model, row, e)
+            return False
+        self.enqueued += 1
+        self.written += 1
+        return True
+
+    def add_assessment(self, session_id, dosha_results, assessment_data):
+        """Queue an Assessment row; returns the row values (including created_at), or None if dropped"""
+        row = {
+            'session_id': session_id,
+            'vata_score': dosha_results['percentages']['vata'],
+            'pitta_score': dosha_results['percentages']['pitta'],
+            'kapha_score': dosha_results['percentages']['kapha'],
+            'dominant_dosha': dosha_results['dominant_dosha'],
+            'secondary_dosha': dosha_results.get('secondary_dosha'),
+            'assessment_data': assessment_data,
+            'created_at': _now()
+        }
+        return row if self.add(Assessment, row) else None
+
+    def add_chat_message(self, session_id, message, sender):
+        """Queue a ChatMessage row; returns False if it was dropped"""
+        return self.add(ChatMessage, {
+            'session_id': session_id,
+            'message': message,
+            'sender': sender,
+            'timestamp': _now()
+        })
+
+    def has_pending(self, model, session_id):
+        """True while a row of model for session_id is queued or being written"""
+        return (session_id in self._pending_sessions.get(model, ())
+                or session_id in self._inflight_sessions.get(model, ()))
+
+    def latest_pending(self, model, session_id):
+        """Most recently queued (or in-flight) row of model for session_id, or None"""
+        for rows in (self._pending.get(model, ()), self._inflight.get(model, ())):
+            for row in reversed(rows):
+                if row.get('session_id') == session_id:
+                    return row
+        return None
+
+    def _requeue(self, model, rows):
+        self._pending[model][:0] = rows
+        self._pending_sessions[model].update(row['session_id'] for row in rows if 'session_id' in row)
+
+    def _dead_letter(self, model, row, error):
+        self.dead_lettered += 1
+        logger.error("Write-behind row failed on its own; moved to dead-letter file",
+                     extra={'table': model.__tablename__, 'error': repr(error), 'path': self.dead_letter_path})
+        entry = {'table': model.__tablename__, 'row': row, 'error': repr(error), 'ts': _now()}
+        try:
+            # ensure_ascii escapes lone surrogates that the database could not encode
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+        except OSError:
+            logger.exception("Could not write dead-letter entry", extra={'entry': json.dumps(entry, default=str)})
+
+    async def _write(self, model, rows):
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(model), rows)
+
+    async def _write_batch(self, batch):
+        """Insert every table's rows in one transaction"""
+        async with self.engine.begin() as conn:
+            for model, rows in batch.items():
+                await conn.execute(insert(model), rows)
+
+    async def _write_isolating(self, model, rows):
+        """
+        Write rows in bisected transactions so one bad row cannot block the rest
+
+        Returns:
+            Tuple of (rows written, rows left unwritten, OperationalError or None);
+            stops at the first OperationalError since that means the database,
+            not a row, is failing
+        """
+        written = 0
+        chunks = [rows]
+        while chunks:
+            chunk = chunks.pop(0)
+            try:
+                await self._write(model, chunk)
+                written += len(chunk)
+            except OperationalError as e:
+                return written, [row for remaining in [chunk] + chunks for row in remaining], e
+            except Exception as e:
+                if len(chunk) == 1:
+                    self._dead_letter(model, chunk[0], e)
+                else:
+                    middle = len(chunk) // 2
+                    chunks[:0] = [chunk[:middle], chunk[middle:]]
+        return written, [], None
+
+    async def flush(self):
+        """Write every queued row; returns the number of rows written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self.depth:
+                return 0
+            batch, self._pending = self._pending, defaultdict(list)
+            self._inflight, self._inflight_sessions = batch, self._pending_sessions
+            self._pending_sessions = defaultdict(set)
+            started = time.perf_counter()
+            try:
+                if self.consecutive_failures >= self.max_attempts:
+                    written = await self._flush_isolating(batch)
+                else:
+                    try:
+                        await self._write_batch(batch)
+                    except Exception:
+                        self.errors += 1
+                        self.consecutive_failures += 1
+                        for model, rows in batch.items():
+                            self._requeue(model, rows)
+                        raise
+                    written = sum(len(rows) for rows in batch.values())
+                    self.written += written
+            finally:
+                self._inflight, self._inflight_sessions = {}, {}
+            self.consecutive_failures = 0
+            elapsed = time.perf_counter() - started
+            DB_COMMIT_SECONDS.observe(elapsed)
+            self.flushes += 1
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            self.total_flush_seconds += elapsed
+            return written
+
+    async def _flush_isolating(self, batch):
+        """Write a batch table by table with _write_isolating; requeues what is left on OperationalError"""
+        written = 0
+        models = list(batch)
+        for position, model in enumerate(models):
+            model_written, unwritten, error = await self._write_isolating(model, batch[model])
+            written += model_written
+            self.written += model_written
+            if error is not None:
+                self.errors += 1
+                self.consecutive_failures += 1
+                self._requeue(model, unwritten)
+                for later in models[position + 1:]:
+                    self._requeue(later, batch[later])
+                raise error
+        return written
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Write-behind flush failed", extra={'queue_depth': self.depth})
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self._wakeup = None
+
+    def stats(self):
+        return {
+            'queue_depth': self.depth,
+            'queue_depth_by_table': {model.__tablename__: len(rows) for model, rows in self._pending.items() if rows},
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'consecutive_failures': self.consecutive_failures,
+            'dropped': self.dropped,
+            'dead_lettered': self.dead_lettered,
+            'max_queue': self.max_queue,
+            'batch_size': self.batch_size,
+            'flush_interval_seconds': self.flush_interval,
+            'last_flush_ms': self.last_flush_seconds * 1000,
+            'max_flush_ms': self.max_flush_seconds * 1000,
+            'avg_flush_ms': self.total_flush_seconds / self.flushes * 1000 if self.flushes else 0.0
+        }
+
+write_behind = WriteBehindQueue()
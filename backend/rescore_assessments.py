@@ -0,0 +1,59 @@
+"""
+Rescore every stored assessment with the current dosha weights
+Run after revising DOSHA_QUESTIONS: python rescore_assessments.py
+"""
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import select, update
+from database.database import SessionLocal
+from database.models import Assessment
+from Training.prakritimodel import get_scoring_engine, DOSHA_ORDER
+
+def rescore_assessments(batch_size=10000):
+    """Recompute scores for all assessments in batches; returns rows updated"""
+    engine = get_scoring_engine()
+    updated = 0
+    last_id = 0
+
+    with SessionLocal() as db:
+        while True:
+            rows = db.execute(
+                select(Assessment.id, Assessment.assessment_data)
+                .where(Assessment.id > last_id)
+                .order_by(Assessment.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            # One NumPy pass per batch
+            results = engine.score_many(row.assessment_data or {} for row in rows)
+            percentages = results['percentages'].tolist()
+            db.execute(update(Assessment), [
+                {
+                    'id': row.id,
+                    'vata_score': percentages[i][0],
+                    'pitta_score': percentages[i][1],
+                    'kapha_score': percentages[i][2],
+                    'dominant_dosha': DOSHA_ORDER[results['dominant'][i]],
+                    'secondary_dosha': DOSHA_ORDER[results['secondary'][i]]
+                }
+                for i, row in enumerate(rows)
+            ])
+            db.commit()
+
+            updated += len(rows)
+            last_id = rows[-1].id
+            print(f"Rescored {updated} assessments...")
+
+    return updated
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    count = rescore_assessments()
+    print(f"\n✓ Rescored {count} assessments in {time.perf_counter() - started:.1f}s")
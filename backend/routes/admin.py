@@ -0,0 +1,114 @@
+"""
+Admin Profiling Endpoints
+Opt-in profiling of a live worker: statistical sampling, per-request
+cProfile captures and tracemalloc snapshots
+
+Disabled unless PROFILING_ENABLED is true or ADMIN_TOKEN is set. With
+ADMIN_TOKEN set, every call (and the per-request profile header) must carry
+a matching X-Admin-Token header; without one, only loopback clients are
+allowed, since profiles and allocation snapshots expose file paths and
+source lines.
+"""
+import asyncio
+import hmac
+import logging
+import os
+import pstats
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response
+from utils.profiling import (
+    sampler, request_profiles, ProfilerBusy, PROFILE_MAX_SECONDS, PROFILE_REQUEST_HEADER,
+    tracemalloc_start, tracemalloc_stop, tracemalloc_status, tracemalloc_top
+)
+
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+# Finer sampling busy-spins the sampler thread against the GIL
+PROFILE_MIN_INTERVAL_MS = 1.0
+SORT_KEYS = sorted(key.value for key in pstats.SortKey)
+LOOPBACK_HOSTS = ('127.0.0.1', '::1', 'localhost')
+# Upper bounds for report sizes and tracemalloc traceback depth
+MAX_REPORT_LIMIT = 500
+MAX_TRACEMALLOC_FRAMES = 100
+
+logger = logging.getLogger(__name__)
+if PROFILING_ENABLED and not ADMIN_TOKEN:
+    logger.warning("PROFILING_ENABLED without ADMIN_TOKEN: admin profiling endpoints accept loopback clients "
+                   "without authentication; set ADMIN_TOKEN before exposing this worker")
+
+def profiling_available() -> bool:
+    return PROFILING_ENABLED or bool(ADMIN_TOKEN)
+
+def admin_authorized(headers, client_host=None) -> bool:
+    """
+    True when profiling is enabled and the caller may use it: a matching
+    X-Admin-Token when ADMIN_TOKEN is set, otherwise a loopback client
+    """
+    if not profiling_available():
+        return False
+    if not ADMIN_TOKEN:
+        return client_host in LOOPBACK_HOSTS
+    return hmac.compare_digest(headers.get('x-admin-token', ''), ADMIN_TOKEN)
+
+def require_admin(request: Request):
+    if not profiling_available():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_authorized(request.headers, request.client.host if request.client else None):
+        detail = "Invalid admin token" if ADMIN_TOKEN else "ADMIN_TOKEN is required for non-local clients"
+        raise HTTPException(status_code=403, detail=detail)
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.post("/profile/sample", response_class=PlainTextResponse)
+async def sample_profile(seconds: float = 10.0, interval_ms: float = 5.0):
+    """Sample every thread for `seconds` and return collapsed stacks"""
+    if seconds <= 0:
+        raise HTTPException(status_code=400, detail="seconds must be positive")
+    if interval_ms < PROFILE_MIN_INTERVAL_MS:
+        raise HTTPException(status_code=400, detail=f"interval_ms must be at least {PROFILE_MIN_INTERVAL_MS:g}")
+    try:
+        # The sampler runs on its own thread so the event loop keeps serving
+        # (and shows up in the samples)
+        stacks = await asyncio.to_thread(sampler.sample, min(seconds, PROFILE_MAX_SECONDS), interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(stacks)
+
+@router.get("/profile/requests")
+async def list_request_profiles():
+    """Recent per-request cProfile captures"""
+    return {'header': PROFILE_REQUEST_HEADER, 'profiles': request_profiles.list()}
+
+@router.get("/profile/requests/{profile_id}")
+async def get_request_profile(profile_id: str, format: str = 'text', sort: str = 'cumulative',
+                              limit: int = Query(50, ge=1, le=MAX_REPORT_LIMIT)):
+    """A captured request profile as a pstats report, or the raw .prof dump with format=prof"""
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
+    if format == 'prof':
+        raw = request_profiles.raw(profile_id)
+        if raw is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return Response(raw, media_type='application/octet-stream',
+                        headers={'Content-Disposition': f'attachment; filename="{profile_id}.prof"'})
+    report = request_profiles.report(profile_id, sort=sort, limit=limit)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(report)
+
+@router.post("/tracemalloc/start")
+async def start_tracemalloc(frames: int = Query(10, ge=1, le=MAX_TRACEMALLOC_FRAMES)):
+    return tracemalloc_start(frames)
+
+@router.post("/tracemalloc/stop")
+async def stop_tracemalloc():
+    return tracemalloc_stop()
+
+@router.get("/tracemalloc")
+async def tracemalloc_snapshot(limit: int = Query(25, ge=1, le=MAX_REPORT_LIMIT), group_by: str = 'lineno'):
+    """Top allocators, and growth since the previous snapshot"""
+    if group_by not in ('lineno', 'filename', 'traceback'):
+        raise HTTPException(status_code=400, detail="group_by must be lineno, filename or traceback")
+    if not tracemalloc_status()['tracing']:
+        raise HTTPException(status_code=409, detail="tracemalloc is not running; POST /admin/tracemalloc/start first")
+    return await asyncio.to_thread(tracemalloc_top, limit, group_by)
@@ -2,16 +2,24 @@
 Assessment API Endpoints
 Handles dosha assessment and results retrieval
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.database import get_db
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_async_db
 from database.models import Assessment
-from Training.prakritimodel import calculate_dosha_scores
-from Training.panchakarma_model import get_panchakarma_recommendations
+from database.write_behind import write_behind
+from Training.panchakarma_model import recommendation_key
+from utils.assessment_scoring import score_dosha
+from utils.executor import run_cpu, ExecutorSaturated
+from utils.responses import RawJSONResponse, assessment_response_body
+from utils.response_cache import assessment_cache, etag_matches
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class AssessmentRequest(BaseModel):
     session_id: str
@@ -21,67 +29,106 @@ class AssessmentResponse(BaseModel):
     dosha_results: Dict[str, Any]
     panchakarma_recs: Dict[str, Any]
 
+def stored_assessment_body(vata, pitta, kapha, dominant_dosha, secondary_dosha, created_at) -> bytes:
+    """GET /api/assessment/{session_id} body for a stored assessment row"""
+    dosha_results = {
+        'percentages': {
+            'vata': vata,
+            'pitta': pitta,
+            'kapha': kapha
+        },
+        'dominant_dosha': dominant_dosha,
+        'secondary_dosha': secondary_dosha
+    }
+    return assessment_response_body(
+        dosha_results,
+        recommendation_key(dosha_results),
+        created_at=created_at.isoformat()
+    )
+
+def queued_assessment_body(row) -> bytes:
+    """Response body for a row queued with write_behind.add_assessment"""
+    return stored_assessment_body(
+        row['vata_score'], row['pitta_score'], row['kapha_score'],
+        row['dominant_dosha'], row['secondary_dosha'], row['created_at']
+    )
+
+def cached_response(entry, if_none_match):
+    """200 with the cached body, or 304 when the client already has it"""
+    headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return RawJSONResponse(entry.body, headers=headers)
+
 @router.post("/api/assessment/calculate", response_model=AssessmentResponse)
-async def calculate_assessment(request: AssessmentRequest, db: Session = Depends(get_db)):
+async def calculate_assessment(request: AssessmentRequest):
     """Calculate dosha scores and get recommendations"""
     try:
-        # Calculate dosha results
-        dosha_results = calculate_dosha_scores(request.assessment_data)
+        # Score off the event loop; recommendations come from their cached serialized form
+        dosha_results = await run_cpu(score_dosha, request.assessment_data)
         
-        # Get Panchakarma recommendations
-        panchakarma_recs = get_panchakarma_recommendations(dosha_results)
+        # Queue the row; the write-behind flusher inserts it with the next batch
+        row = write_behind.add_assessment(request.session_id, dosha_results, request.assessment_data)
+        if row is None:
+            # Not persisted, so don't return (or cache) a result GET can't serve later
+            raise HTTPException(status_code=503, detail="Assessment storage is unavailable; please retry",
+                                headers={"Retry-After": "1"})
         
-        # Save to database
-        assessment = Assessment(
-            session_id=request.session_id,
-            vata_score=dosha_results['percentages']['vata'],
-            pitta_score=dosha_results['percentages']['pitta'],
-            kapha_score=dosha_results['percentages']['kapha'],
-            dominant_dosha=dosha_results['dominant_dosha'],
-            secondary_dosha=dosha_results.get('secondary_dosha'),
-            assessment_data=request.assessment_data
-        )
-        db.add(assessment)
-        db.commit()
-        db.refresh(assessment)
+        # Replace the session's cached GET response with the new result
+        assessment_cache.put(request.session_id, queued_assessment_body(row))
         
-        return AssessmentResponse(
-            dosha_results=dosha_results,
-            panchakarma_recs=panchakarma_recs
-        )
+        return RawJSONResponse(assessment_response_body(dosha_results, recommendation_key(dosha_results)))
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/assessment/{session_id}")
-async def get_assessment(session_id: str, db: Session = Depends(get_db)):
+async def get_assessment(
+    session_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    if_none_match: Optional[str] = Header(None)
+):
     """Retrieve assessment results by session ID"""
-    assessment = db.query(Assessment).filter(Assessment.session_id == session_id).order_by(Assessment.created_at.desc()).first()
+    entry = assessment_cache.get(session_id)
+    if entry is not None:
+        return cached_response(entry, if_none_match)
+    # Taken before any await so a result stored meanwhile isn't overwritten below
+    generation = assessment_cache.generation()
+    
+    # Make sure this session's queued assessments are readable
+    if write_behind.has_pending(Assessment, session_id):
+        try:
+            await write_behind.flush()
+        except Exception:
+            # Queued rows are newer than anything stored, so serve the latest
+            # one while the database is failing
+            logger.warning("Write-behind flush failed; serving queued assessment",
+                           exc_info=True, extra={'session_id': session_id})
+            row = write_behind.latest_pending(Assessment, session_id)
+            if row is not None:
+                entry = assessment_cache.fill(session_id, queued_assessment_body(row), generation)
+                return cached_response(entry, if_none_match)
+    
+    result = await db.execute(
+        select(
+            Assessment.vata_score,
+            Assessment.pitta_score,
+            Assessment.kapha_score,
+            Assessment.dominant_dosha,
+            Assessment.secondary_dosha,
+            Assessment.created_at
+        )
+        .where(Assessment.session_id == session_id)
+        .order_by(Assessment.created_at.desc())
+        .limit(1)
+    )
+    assessment = result.first()
     
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    # Recalculate recommendations
-    panchakarma_recs = get_panchakarma_recommendations({
-        'dominant_dosha': assessment.dominant_dosha,
-        'secondary_dosha': assessment.secondary_dosha,
-        'percentages': {
-            'vata': assessment.vata_score,
-            'pitta': assessment.pitta_score,
-            'kapha': assessment.kapha_score
-        }
-    })
-    
-    return {
-        'dosha_results': {
-            'percentages': {
-                'vata': assessment.vata_score,
-                'pitta': assessment.pitta_score,
-                'kapha': assessment.kapha_score
-            },
-            'dominant_dosha': assessment.dominant_dosha,
-            'secondary_dosha': assessment.secondary_dosha
-        },
-        'panchakarma_recs': panchakarma_recs,
-        'created_at': assessment.created_at.isoformat()
-    }
-
+    entry = assessment_cache.fill(session_id, stored_assessment_body(*assessment), generation)
+    return cached_response(entry, if_none_match)
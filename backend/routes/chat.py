@@ -4,28 +4,62 @@ Handles real-time conversation with AyurSutra Bot
 """
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import json
+import logging
 import pickle
 import os
 import asyncio
+import random
+import sys
 from datetime import datetime
-from utils.nlp_processor import clean_text, match_intent, extract_dosha_keywords
-from Training.prakritimodel import calculate_dosha_scores
-from Training.panchakarma_model import get_panchakarma_recommendations
+from utils.nlp_processor import clean_text, match_intent, extract_dosha_keywords, build_intent_index
+from utils import nlp_processor
+from utils.intent_classifier import IntentBatcher
+from utils.assessment_scoring import score_assessment, configure_result_cache
+from Training.panchakarma_model import recommendation_key
+from utils.executor import run_cpu, ExecutorSaturated
+from utils.pacing import PACING_MODES, resolve_pacing, pace
+from utils.chat_session import ChatSession
+from utils.session_store import SessionStore, create_session_store, SESSION_SWEEP_INTERVAL_SECONDS
+from database.write_behind import write_behind
+from utils.response_cache import assessment_cache
+from routes.assessment import queued_assessment_body
+from utils.metrics import registry, stage
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Load chatbot model and intents
 models_dir = os.path.join(os.path.dirname(__file__), '..', 'Models')
 chatbot_model = None
 intents_data = None
+intents_by_tag = {}
+intent_index = None
+intent_batcher = None
 
 try:
     with open(os.path.join(models_dir, 'chatbot_model.pkl'), 'rb') as f:
         chatbot_model = pickle.load(f)
     with open(os.path.join(models_dir, 'intents.pkl'), 'rb') as f:
         intents_data = pickle.load(f)
+    intents_by_tag = {intent['tag']: intent for intent in intents_data['intents']}
+    # Shared across all WebSocket sessions so concurrent messages batch together
+    intent_batcher = IntentBatcher(chatbot_model, preprocess=clean_text)
 except:
-    print("Warning: Chatbot models not found. Please train models first.")
+    logger.warning("Chatbot models not found. Please train models first.")
+
+def get_intent_index():
+    """Intent patterns cleaned once into an index, built on first use or warmup"""
+    global intent_index
+    if intent_index is None and intents_data:
+        intent_index = build_intent_index(intents_data['intents'])
+    return intent_index
+
+def warmup():
+    """Load NLP resources, build the intent index and fill caches off the request path"""
+    nlp_processor.warmup()
+    get_intent_index()
+    if result_cache.mode == 'full':
+        result_cache.materialize()
 
 # Assessment questions flow
 ASSESSMENT_QUESTIONS = [
@@ -147,23 +181,55 @@ OPTION_MAPPING = {
     }
 }
 
+# Precomputed scores for the finite space of complete chat assessments
+result_cache = configure_result_cache(ASSESSMENT_QUESTIONS, OPTION_MAPPING)
+
+# Option text -> index for each question, so answers are stored as small integers
+OPTION_INDEX = [{option: i for i, option in enumerate(q['options'])} for q in ASSESSMENT_QUESTIONS]
+
+def new_session() -> ChatSession:
+    return ChatSession(len(ASSESSMENT_QUESTIONS))
+
+def assessment_data_from_answers(session: ChatSession) -> dict:
+    """Map a session's stored option indices back to dosha values for scoring"""
+    assessment_data = {}
+    for question_index, option_index in session.answered_options():
+        question = ASSESSMENT_QUESTIONS[question_index]
+        option = question['options'][option_index]
+        assessment_data[question['id']] = OPTION_MAPPING.get(question['id'], {}).get(option, option.lower())
+    return assessment_data
+
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, session_store: SessionStore = None):
         self.active_connections: dict[str, WebSocket] = {}
-        self.user_sessions: dict[str, dict] = {}
+        # Session state lives in a pluggable store (SESSION_STORE) with TTL eviction
+        self.user_sessions: SessionStore = session_store or create_session_store()
+    
+    async def _store_call(self, method, *args):
+        if self.user_sessions.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
     
-    async def connect(self, websocket: WebSocket, session_id: str):
+    async def connect(self, websocket: WebSocket, session_id: str) -> ChatSession:
         await websocket.accept()
         self.active_connections[session_id] = websocket
-        if session_id not in self.user_sessions:
-            self.user_sessions[session_id] = {
-                'assessment_data': {},
-                'current_question': 0,
-                'assessment_complete': False,
-                'dosha_results': None,
-                'panchakarma_recs': None,
-                'has_sent_welcome': False  # Track if welcome message was sent
-            }
+        session = await self._store_call(self.user_sessions.get, session_id)
+        if session is None:
+            session = new_session()
+            await self.save_session(session_id, session)
+        return session
+    
+    async def save_session(self, session_id: str, session: ChatSession):
+        await self._store_call(self.user_sessions.save, session_id, session)
+    
+    async def evict_expired_sessions(self) -> int:
+        return await self._store_call(self.user_sessions.evict_expired)
+    
+    async def stats(self) -> dict:
+        return {
+            'active_connections': len(self.active_connections),
+            'sessions': await self._store_call(self.user_sessions.stats)
+        }
     
     def disconnect(self, session_id: str):
         if session_id in self.active_connections:
@@ -182,28 +248,63 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-async def simulate_typing_delay():
-    """Simulate bot thinking time"""
-    await asyncio.sleep(0.5)
+WS_TURN_SECONDS = stage('ws_turn')
+
+registry.gauge('ayursutra_active_connections', 'Open chat WebSocket connections',
+               lambda: len(manager.active_connections))
+registry.gauge('ayursutra_chat_sessions', 'Chat sessions held by the session store',
+               lambda: manager.user_sessions.count())
+
+async def sweep_sessions(interval: float = SESSION_SWEEP_INTERVAL_SECONDS):
+    """Background task evicting expired sessions until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await manager.evict_expired_sessions()
+        except Exception:
+            logger.exception("Session sweep failed")
+
+async def send_reply(message: dict, session: ChatSession, session_id: str, turn_started: float):
+    """Send a bot reply once the session's pacing policy allows it"""
+    # Turn latency up to the reply being ready, excluding deliberate pacing
+    WS_TURN_SECONDS.observe(asyncio.get_running_loop().time() - turn_started)
+    await pace(resolve_pacing(session.pacing), turn_started, message.get('text', ''))
+    await manager.send_personal_message(message, session_id)
+    write_behind.add_chat_message(session_id, message.get('text') or message['type'], 'bot')
+    # Every state change in a turn is followed by a reply, so persist here
+    await manager.save_session(session_id, session)
+
+async def get_intent_response(user_message: str):
+    """Classify a message with the trained model and pick a response for its intent"""
+    if intent_batcher and intents_data:
+        try:
+            # Cleaning (memoized) and prediction run batched on the CPU executor
+            intent_tag, _ = await intent_batcher.classify(user_message)
+            intent = intents_by_tag.get(intent_tag)
+            if intent:
+                return random.choice(intent['responses'])
+        except:
+            pass
+    index = get_intent_index()
+    if index is not None:
+        # Classifier failed or returned an unknown tag: keyword match on the prebuilt index
+        intent = match_intent(user_message, index)
+        if intent and intent.get('responses'):
+            return random.choice(intent['responses'])
+    return None
 
-async def get_bot_response(user_message: str, session: dict, session_id: str) -> str:
+async def get_bot_response(user_message: str, session: ChatSession, session_id: str) -> str:
     """Get appropriate bot response based on user message and session state"""
     # If assessment is complete, handle general conversation
-    if session['assessment_complete']:
-        if chatbot_model and intents_data:
-            try:
-                intent_tag = chatbot_model.predict([clean_text(user_message)])[0]
-                intent = next((i for i in intents_data['intents'] if i['tag'] == intent_tag), None)
-                if intent:
-                    import random
-                    return random.choice(intent['responses'])
-            except:
-                pass
+    if session.assessment_complete:
+        intent_response = await get_intent_response(user_message)
+        if intent_response:
+            return intent_response
         return "You've completed your assessment! Would you like to see your results again?"
     
     # If assessment is in progress, continue with it
-    if session['current_question'] < len(ASSESSMENT_QUESTIONS):
-        current_q = ASSESSMENT_QUESTIONS[session['current_question']]
+    if session.current_question < len(ASSESSMENT_QUESTIONS):
+        current_q = ASSESSMENT_QUESTIONS[session.current_question]
         if user_message in current_q['options']:
             # Valid option selected, handled in main loop
             return None
@@ -217,15 +318,9 @@ async def get_bot_response(user_message: str, session: dict, session_id: str) ->
         return None  # Will start assessment in main loop
     
     # General conversation before assessment starts
-    if chatbot_model and intents_data:
-        try:
-            intent_tag = chatbot_model.predict([clean_text(user_message)])[0]
-            intent = next((i for i in intents_data['intents'] if i['tag'] == intent_tag), None)
-            if intent:
-                import random
-                return random.choice(intent['responses'])
-        except:
-            pass
+    intent_response = await get_intent_response(user_message)
+    if intent_response:
+        return intent_response
     
     # Default response
     return "I'm here to help you with your Ayurvedic assessment. Type 'start' to begin!"
@@ -237,109 +332,126 @@ async def websocket_endpoint(websocket: WebSocket):
         # Get session ID from query params or generate one
         session_id = websocket.query_params.get("session_id", f"session_{datetime.now().timestamp()}")
         
-        await manager.connect(websocket, session_id)
-        session = manager.user_sessions[session_id]
+        session = await manager.connect(websocket, session_id)
+        # Optional per-session override of the deployment pacing mode (?pacing=off)
+        if websocket.query_params.get('pacing') in PACING_MODES:
+            session.pacing = sys.intern(websocket.query_params['pacing'])
         
         # Send welcome message ONLY ONCE per session
-        if not session.get('has_sent_welcome', False):
-            print(f"Sending welcome message to session {session_id}")
+        if not session.has_sent_welcome:
+            logger.debug("Sending welcome message", extra={'session_id': session_id})
             await manager.send_personal_message({
                 'type': 'message',
                 'sender': 'bot',
                 'text': "Namaste! 🌿 I'm AyurSutra Bot, your Ayurvedic wellness assistant. I'll help you discover your Dosha (Prakriti) and recommend personalized Panchakarma therapies. Are you ready to begin your assessment?",
                 'timestamp': datetime.now().isoformat()
             }, session_id)
-            session['has_sent_welcome'] = True
-            print(f"Welcome message sent and flagged for session {session_id}")
+            session.has_sent_welcome = True
         else:
-            print(f"Welcome message already sent for session {session_id}, skipping")
+            logger.debug("Welcome message already sent, skipping", extra={'session_id': session_id})
+        await manager.save_session(session_id, session)
         
         while True:
             # Wait for user message
             data = await websocket.receive_json()
-            print(f"Received data from client: {data}")
+            logger.debug("Received data from client", extra={'session_id': session_id, 'data': data})
+            if data.get('pacing') in PACING_MODES:
+                session.pacing = sys.intern(data['pacing'])
             user_message = data.get('message', '').strip()
             
             if not user_message:
-                print("Empty message received, skipping")
+                logger.debug("Empty message received, skipping", extra={'session_id': session_id})
+                if 'pacing' in data:
+                    await manager.save_session(session_id, session)
                 continue
             
-            print(f"Processing user message: {user_message}")
+            logger.debug("Processing user message", extra={'session_id': session_id, 'user_message': user_message})
+            write_behind.add_chat_message(session_id, user_message, 'user')
             
-            # Simulate typing
-            await simulate_typing_delay()
+            # Show the typing indicator right away; pacing happens in send_reply
+            turn_started = asyncio.get_running_loop().time()
             await manager.send_typing_indicator(session_id)
-            await asyncio.sleep(1)
             
             # Check if assessment is in progress
-            if session['current_question'] < len(ASSESSMENT_QUESTIONS):
-                current_q = ASSESSMENT_QUESTIONS[session['current_question']]
+            if session.current_question < len(ASSESSMENT_QUESTIONS):
+                current_q = ASSESSMENT_QUESTIONS[session.current_question]
                 
                 # Check if user selected a valid option
                 if user_message in current_q['options']:
-                    # Map answer to dosha value
-                    question_id = current_q['id']
-                    dosha_value = OPTION_MAPPING.get(question_id, {}).get(user_message, user_message.lower())
-                    session['assessment_data'][question_id] = dosha_value
+                    # Store the answer as an option index; dosha values are mapped at scoring time
+                    session.record_answer(session.current_question, OPTION_INDEX[session.current_question][user_message])
                     
-                    session['current_question'] += 1
+                    session.current_question += 1
                     
                     # Check if assessment is complete
-                    if session['current_question'] >= len(ASSESSMENT_QUESTIONS):
-                        # Calculate dosha results
-                        dosha_results = calculate_dosha_scores(session['assessment_data'])
-                        session['dosha_results'] = dosha_results
-                        
-                        # Get Panchakarma recommendations
-                        panchakarma_recs = get_panchakarma_recommendations(dosha_results)
-                        session['panchakarma_recs'] = panchakarma_recs
-                        session['assessment_complete'] = True
+                    if session.current_question >= len(ASSESSMENT_QUESTIONS):
+                        # Calculate dosha results and Panchakarma recommendations off the event loop
+                        assessment_data = assessment_data_from_answers(session)
+                        try:
+                            dosha_results, panchakarma_recs = await run_cpu(score_assessment, assessment_data)
+                        except ExecutorSaturated:
+                            # Keep the last answer pending so resending it retries scoring
+                            session.current_question -= 1
+                            await send_reply({
+                                'type': 'message',
+                                'sender': 'bot',
+                                'text': "I'm a little busy right now. Please send your last answer again in a moment.",
+                                'timestamp': datetime.now().isoformat()
+                            }, session, session_id, turn_started)
+                            continue
+                        session.complete(dosha_results, recommendation_key(dosha_results))
+                        row = write_behind.add_assessment(session_id, dosha_results, assessment_data)
+                        if row is not None:
+                            # Same as POST /api/assessment/calculate: the queued row becomes the cached GET response
+                            assessment_cache.put(session_id, queued_assessment_body(row))
+                        else:
+                            logger.warning("Assessment dropped by the write-behind queue", extra={'session_id': session_id})
+                            assessment_cache.invalidate(session_id)
                         
                         # Send results
-                        await manager.send_personal_message({
+                        await send_reply({
                             'type': 'assessment_complete',
                             'sender': 'bot',
                             'dosha_results': dosha_results,
                             'panchakarma_recs': panchakarma_recs,
                             'timestamp': datetime.now().isoformat()
-                        }, session_id)
+                        }, session, session_id, turn_started)
                     else:
                         # Ask next question
-                        next_q = ASSESSMENT_QUESTIONS[session['current_question']]
-                        await manager.send_personal_message({
+                        next_q = ASSESSMENT_QUESTIONS[session.current_question]
+                        await send_reply({
                             'type': 'question',
                             'sender': 'bot',
                             'text': next_q['question'],
                             'question_id': next_q['id'],
                             'options': next_q['options'],
                             'progress': {
-                                'current': session['current_question'] + 1,
+                                'current': session.current_question + 1,
                                 'total': len(ASSESSMENT_QUESTIONS)
                             },
                             'timestamp': datetime.now().isoformat()
-                        }, session_id)
+                        }, session, session_id, turn_started)
                 else:
                     # Invalid option, re-ask current question
-                    await manager.send_personal_message({
+                    await send_reply({
                         'type': 'question',
                         'sender': 'bot',
                         'text': f"{current_q['question']} Please select one of the options below:",
                         'question_id': current_q['id'],
                         'options': current_q['options'],
                         'progress': {
-                            'current': session['current_question'] + 1,
+                            'current': session.current_question + 1,
                             'total': len(ASSESSMENT_QUESTIONS)
                         },
                         'timestamp': datetime.now().isoformat()
-                    }, session_id)
+                    }, session, session_id, turn_started)
             
             # Check if user wants to start assessment
             elif user_message.lower() in ['start', 'begin', 'yes', 'ready', 'let\'s start', 'let\'s begin']:
                 # Start assessment
-                session['current_question'] = 0
-                session['assessment_data'] = {}
+                session.reset_assessment()
                 first_q = ASSESSMENT_QUESTIONS[0]
-                await manager.send_personal_message({
+                await send_reply({
                     'type': 'question',
                     'sender': 'bot',
                     'text': first_q['question'],
@@ -350,27 +462,25 @@ async def websocket_endpoint(websocket: WebSocket):
                         'total': len(ASSESSMENT_QUESTIONS)
                     },
                     'timestamp': datetime.now().isoformat()
-                }, session_id)
+                }, session, session_id, turn_started)
             
             else:
                 # Handle general conversation
                 bot_response = await get_bot_response(user_message, session, session_id)
                 
                 if bot_response:
-                    await manager.send_personal_message({
+                    await send_reply({
                         'type': 'message',
                         'sender': 'bot',
                         'text': bot_response,
                         'timestamp': datetime.now().isoformat()
-                    }, session_id)
+                    }, session, session_id, turn_started)
     
     except WebSocketDisconnect:
         if session_id:
             manager.disconnect(session_id)
-    except Exception as e:
-        import traceback
-        print(f"WebSocket error: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
+    except Exception:
+        logger.exception("WebSocket error", extra={'session_id': session_id})
         if session_id:
             manager.disconnect(session_id)
 
@@ -0,0 +1,37 @@
+"""
+Intent Classification API Endpoints
+Bulk labelling of messages with the trained chatbot model
+"""
+import os
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List
+from routes import chat
+from utils.executor import ExecutorSaturated
+
+router = APIRouter()
+
+MAX_BATCH_MESSAGES = int(os.getenv('INTENT_BATCH_MAX_MESSAGES', '1000'))
+
+class IntentBatchRequest(BaseModel):
+    messages: List[str]
+
+@router.post("/api/intent/batch")
+async def classify_intents(request: IntentBatchRequest):
+    """Classify a list of messages in vectorized chunks on the CPU executor"""
+    if chat.intent_batcher is None:
+        raise HTTPException(status_code=503, detail="Chatbot model not loaded")
+    if len(request.messages) > MAX_BATCH_MESSAGES:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_MESSAGES} messages per batch")
+
+    try:
+        results = await chat.intent_batcher.classify_many(request.messages)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    return {
+        'results': [
+            {'message': message, 'intent': tag, 'confidence': round(confidence, 4)}
+            for message, (tag, confidence) in zip(request.messages, results)
+        ]
+    }
@@ -2,14 +2,25 @@
 PDF Generation Endpoint
 Creates downloadable PDF reports
 """
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import Response, JSONResponse, RedirectResponse
 from pydantic import BaseModel
 from typing import Dict, Any
-from utils.simple_pdf_generator import generate_pdf_report
+from utils.simple_pdf_generator import render_pdf_report, save_pdf_report
+from utils.pdf_cache import pdf_cache, report_key
+from utils.pdf_jobs import pdf_jobs, PDFQueueFull
+from utils.executor import run_cpu, ExecutorSaturated
+import logging
 import os
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Also keep a copy of each distinct report in backend/reports (written after the response)
+PDF_PERSIST_REPORTS = os.getenv('PDF_PERSIST_REPORTS', 'false').lower() in ('1', 'true', 'yes')
+
+# 'sync' renders inside the request; 'job' queues the report and returns a job id
+PDF_GENERATE_MODE = os.getenv('PDF_GENERATE_MODE', 'sync')
 
 class PDFRequest(BaseModel):
     user_data: Dict[str, Any] = {}
@@ -17,24 +28,72 @@ class PDFRequest(BaseModel):
     panchakarma_recs: Dict[str, Any]
 
 @router.post("/api/pdf/generate")
-async def generate_pdf(request: PDFRequest):
-    """Generate PDF report"""
+async def generate_pdf(request: PDFRequest, background_tasks: BackgroundTasks, mode: str = PDF_GENERATE_MODE):
+    """Generate PDF report, or queue it as a job with mode=job"""
+    if mode == 'job':
+        return submit_pdf_job(request)
     try:
-        pdf_path = generate_pdf_report(
-            request.user_data,
-            request.dosha_results,
-            request.panchakarma_recs
-        )
+        # Identical reports are served from the content-addressed cache
+        key = report_key(request.dosha_results, request.panchakarma_recs)
+        pdf_bytes = pdf_cache.get(key)
+        if pdf_bytes is None:
+            # ReportLab's doc.build is CPU-bound; keep it off the event loop.
+            # The report is built in memory and returned without touching disk.
+            pdf_bytes = await run_cpu(
+                render_pdf_report,
+                request.user_data,
+                request.dosha_results,
+                request.panchakarma_recs
+            )
+            pdf_cache.put(key, pdf_bytes)
 
-        if not os.path.exists(pdf_path):
-            raise HTTPException(status_code=500, detail="PDF file was not generated")
+            if PDF_PERSIST_REPORTS:
+                background_tasks.add_task(save_pdf_report, pdf_bytes, filename=f'assessment_report_{key[:32]}.pdf')
 
-        return FileResponse(
-            pdf_path,
+        return Response(
+            content=pdf_bytes,
             media_type='application/pdf',
-            filename='ayursutra_assessment_report.pdf'
+            headers={'Content-Disposition': 'attachment; filename="ayursutra_assessment_report.pdf"'}
         )
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
-        print(f"PDF generation error: {e}")
+        logger.exception("PDF generation failed")
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
+def job_status(job):
+    status = {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f"/api/pdf/jobs/{job.id}"
+    }
+    if job.status == 'done':
+        status['url'] = f"/reports/{job.filename}"
+    elif job.status == 'failed':
+        status['error'] = job.error
+    return status
+
+def submit_pdf_job(request: PDFRequest):
+    """Queue a report for the PDF worker pool"""
+    try:
+        job = pdf_jobs.submit(request.user_data, request.dosha_results, request.panchakarma_recs)
+    except PDFQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return JSONResponse(job_status(job), status_code=202)
+
+@router.post("/api/pdf/jobs", status_code=202)
+async def create_pdf_job(request: PDFRequest):
+    """Queue a PDF report and return its job id immediately"""
+    return submit_pdf_job(request)
+
+@router.get("/api/pdf/jobs/{job_id}")
+async def get_pdf_job(job_id: str):
+    """Job status while pending; redirects to the report under /reports once done"""
+    job = pdf_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="PDF job not found")
+    if job.status == 'done':
+        if not os.path.exists(pdf_jobs.file_path(job)):
+            raise HTTPException(status_code=410, detail="PDF report has expired")
+        return RedirectResponse(f"/reports/{job.filename}", status_code=303)
+    return job_status(job)
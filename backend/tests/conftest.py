@@ -0,0 +1,35 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import backend modules the way app.py does (run from any directory)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Scratch database and unpaced chat replies, set before any backend import
+SCRATCH_DIR = tempfile.mkdtemp(prefix='ayursutra-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(SCRATCH_DIR, 'test.db')}")
+os.environ.setdefault('WRITE_BEHIND_DEAD_LETTER_PATH', os.path.join(SCRATCH_DIR, 'dead_letter.jsonl'))
+os.environ.setdefault('CHAT_PACING', 'off')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+@pytest.fixture(scope='session')
+def client():
+    """TestClient with the app lifespan running (write-behind flusher, PDF workers)"""
+    from fastapi.testclient import TestClient
+    from app import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+def assessment_options(choice=0):
+    """Option text chosen for each assessment question; choices 0, 1 and 2
+    lean vata, pitta and kapha"""
+    from routes.chat import ASSESSMENT_QUESTIONS
+    return [question['options'][choice % len(question['options'])] for question in ASSESSMENT_QUESTIONS]
+
+def assessment_answers(choice=0):
+    """REST assessment_data (dosha values) for assessment_options(choice)"""
+    from routes.chat import ASSESSMENT_QUESTIONS, OPTION_MAPPING
+    return {question['id']: OPTION_MAPPING.get(question['id'], {}).get(option, option.lower())
+            for question, option in zip(ASSESSMENT_QUESTIONS, assessment_options(choice))}
@@ -0,0 +1,35 @@
+"""
+Admin profiling endpoints reject out-of-range parameters before touching
+tracemalloc or pstats
+"""
+import tracemalloc
+
+import pytest
+
+from routes import admin
+
+TOKEN = {'X-Admin-Token': 'test-token'}
+
+@pytest.fixture
+def admin_enabled(monkeypatch):
+    monkeypatch.setattr(admin, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(admin, 'ADMIN_TOKEN', 'test-token')
+
+@pytest.mark.parametrize('frames', [0, -1, admin.MAX_TRACEMALLOC_FRAMES + 1])
+def test_tracemalloc_frames_are_bounded(client, admin_enabled, frames):
+    response = client.post(f'/admin/tracemalloc/start?frames={frames}', headers=TOKEN)
+    assert response.status_code == 422
+    assert not tracemalloc.is_tracing()
+
+@pytest.mark.parametrize('path', ['/admin/tracemalloc', '/admin/profile/requests/missing'])
+@pytest.mark.parametrize('limit', [0, -5, admin.MAX_REPORT_LIMIT + 1])
+def test_report_limits_are_bounded(client, admin_enabled, path, limit):
+    assert client.get(f'{path}?limit={limit}', headers=TOKEN).status_code == 422
+
+def test_valid_parameters_still_work(client, admin_enabled):
+    try:
+        assert client.post('/admin/tracemalloc/start?frames=1', headers=TOKEN).status_code == 200
+        assert client.get('/admin/tracemalloc?limit=5', headers=TOKEN).status_code == 200
+    finally:
+        client.post('/admin/tracemalloc/stop', headers=TOKEN)
+    assert client.get('/admin/profile/requests/missing?limit=5', headers=TOKEN).status_code == 404
@@ -0,0 +1,54 @@
+"""
+Cached GET /api/assessment responses stay consistent whichever entry point
+(REST calculate or the chat WebSocket) completed the latest assessment
+"""
+from conftest import assessment_answers, assessment_options
+
+def receive_reply(ws):
+    """Next non-typing frame from the chat socket"""
+    while True:
+        message = ws.receive_json()
+        if message.get('type') != 'typing':
+            return message
+
+def chat_assessment(client, session_id, choice, welcome=True):
+    """Complete an assessment over /ws/chat; returns the assessment_complete frame"""
+    with client.websocket_connect(f'/ws/chat?session_id={session_id}&pacing=off') as ws:
+        if welcome:  # sent once per session
+            receive_reply(ws)
+        ws.send_json({'message': 'start'})
+        reply = receive_reply(ws)
+        for option in assessment_options(choice):
+            assert reply['type'] == 'question'
+            ws.send_json({'message': option})
+            reply = receive_reply(ws)
+        assert reply['type'] == 'assessment_complete'
+        return reply
+
+def percentages(client, session_id):
+    response = client.get(f'/api/assessment/{session_id}')
+    assert response.status_code == 200
+    return response.json()['dosha_results']['percentages'], response.headers['etag']
+
+def test_rest_result_is_served_with_etag(client):
+    posted = client.post('/api/assessment/calculate',
+                         json={'session_id': 'rest-etag', 'assessment_data': assessment_answers(0)}).json()
+    result, etag = percentages(client, 'rest-etag')
+    assert result == posted['dosha_results']['percentages']
+    assert client.get('/api/assessment/rest-etag', headers={'If-None-Match': etag}).status_code == 304
+
+def test_chat_and_rest_results_replace_each_other(client):
+    completed = chat_assessment(client, 'both-paths', 1)
+    from_chat, chat_etag = percentages(client, 'both-paths')
+    assert from_chat == completed['dosha_results']['percentages']
+
+    posted = client.post('/api/assessment/calculate',
+                         json={'session_id': 'both-paths', 'assessment_data': assessment_answers(2)}).json()
+    from_rest, rest_etag = percentages(client, 'both-paths')
+    assert from_rest == posted['dosha_results']['percentages'] != from_chat
+    assert rest_etag != chat_etag
+    # A client holding the chat result's ETag gets the new body, not a 304
+    assert client.get('/api/assessment/both-paths', headers={'If-None-Match': chat_etag}).status_code == 200
+
+    completed = chat_assessment(client, 'both-paths', 0, welcome=False)
+    assert percentages(client, 'both-paths')[0] == completed['dosha_results']['percentages']
@@ -0,0 +1,37 @@
+"""
+DOSHA_QUESTIONS is read-only; set_dosha_weights is the one way to revise it,
+so the compiled engine and the result cache never score with stale weights
+"""
+import copy
+
+import pytest
+
+from Training import prakritimodel
+from Training.prakritimodel import DOSHA_QUESTIONS, calculate_dosha_scores, get_scoring_engine, set_dosha_weights
+from utils.assessment_scoring import score_assessment
+from conftest import assessment_answers
+
+def test_weights_cannot_be_changed_in_place():
+    with pytest.raises(TypeError):
+        DOSHA_QUESTIONS['vata'] = {}
+    with pytest.raises(TypeError):
+        DOSHA_QUESTIONS['vata']['sleep']['light'] = 0
+    with pytest.raises(TypeError):
+        DOSHA_QUESTIONS['pitta'].update({'sleep': {}})
+
+def test_revised_weights_reach_engine_and_result_cache():
+    original = copy.deepcopy(DOSHA_QUESTIONS)
+    answers = assessment_answers(0)
+    before = score_assessment(answers)[0]
+    revised = copy.deepcopy(original)
+    revised['kapha'] = {question: {answer: 10 for answer in weights} for question, weights in original['vata'].items()}
+    try:
+        set_dosha_weights(revised)
+        assert get_scoring_engine().score(answers)['scores'] == calculate_dosha_scores(answers)['scores']
+        after = score_assessment(answers)[0]
+        assert after['dominant_dosha'] == 'kapha' != before['dominant_dosha']
+        assert after['percentages'] == calculate_dosha_scores(answers)['percentages']
+    finally:
+        set_dosha_weights(original)
+    assert prakritimodel.DOSHA_QUESTIONS is DOSHA_QUESTIONS
+    assert score_assessment(answers)[0]['percentages'] == before['percentages']
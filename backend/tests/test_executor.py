@@ -0,0 +1,40 @@
+"""
+CPU executor backpressure counts work until it finishes on the pool, even
+when the awaiting task is cancelled first
+"""
+import asyncio
+import threading
+
+import pytest
+
+from utils.executor import CPUExecutor, ExecutorSaturated
+
+def test_cancelled_caller_keeps_slot_until_work_finishes():
+    executor = CPUExecutor(kind='thread', max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.create_task(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The worker is still running, so there is no free slot yet
+        assert executor.stats()['in_flight'] == 1
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(sum, [1, 2])
+        release.set()
+        for _ in range(100):
+            if executor.stats()['in_flight'] == 0:
+                break
+            await asyncio.sleep(0.01)
+        return await executor.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(scenario()) == 3
+        stats = executor.stats()
+        assert stats['in_flight'] == 0
+        assert stats['completed'] == 2 and stats['rejected'] == 1
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,36 @@
+"""
+POST /api/intent/batch: bounded size, chunked onto the CPU executor and
+subject to its backpressure
+"""
+from routes import intent
+from utils import intent_classifier
+from utils.executor import ExecutorSaturated
+
+def test_batch_is_classified_in_chunks(client, monkeypatch):
+    calls = []
+    run_cpu = intent_classifier.run_cpu
+
+    async def counting_run_cpu(fn, *args):
+        calls.append(len(args[-1]))
+        return await run_cpu(fn, *args)
+
+    monkeypatch.setattr(intent_classifier, 'run_cpu', counting_run_cpu)
+    messages = ['hello', 'what is vata dosha', 'thank you'] * 50
+    response = client.post('/api/intent/batch', json={'messages': messages})
+    assert response.status_code == 200
+    assert [result['message'] for result in response.json()['results']] == messages
+    max_chunk = intent.chat.intent_batcher.max_batch_size
+    assert sum(calls) == len(messages) and max(calls) <= max_chunk
+
+def test_oversized_batch_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(intent, 'MAX_BATCH_MESSAGES', 2)
+    assert client.post('/api/intent/batch', json={'messages': ['a', 'b', 'c']}).status_code == 413
+
+def test_saturated_executor_returns_503(client, monkeypatch):
+    async def saturated(fn, *args):
+        raise ExecutorSaturated("CPU executor queue is full")
+
+    monkeypatch.setattr(intent_classifier, 'run_cpu', saturated)
+    response = client.post('/api/intent/batch', json={'messages': ['hello']})
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '1'
@@ -0,0 +1,37 @@
+"""
+Keyword intent matching: raw intent lists are indexed once, and the
+fingerprint walk over every pattern only happens on build or refresh
+"""
+import asyncio
+
+from utils import nlp_processor
+from utils.nlp_processor import IntentIndex, build_intent_index, match_intent
+
+def intents():
+    return [{'tag': 'greeting', 'patterns': ['hello there'], 'responses': ['Hi']},
+            {'tag': 'goodbye', 'patterns': ['bye now'], 'responses': ['Bye']}]
+
+def test_raw_list_is_indexed_once_without_fingerprinting_each_match(monkeypatch):
+    data = intents()
+    index = build_intent_index(data)
+
+    def fingerprint(_):
+        raise AssertionError("fingerprinted on a plain lookup")
+
+    monkeypatch.setattr(nlp_processor, 'intents_fingerprint', fingerprint)
+    assert build_intent_index(data) is index
+    assert match_intent('hello there', data)['tag'] == 'greeting'
+
+def test_refresh_rebuilds_after_in_place_edit():
+    data = intents()
+    index = build_intent_index(data)
+    assert build_intent_index(data, refresh=True) is index
+    data[0]['patterns'].append('good morning')
+    assert match_intent('good morning', build_intent_index(data, refresh=True))['tag'] == 'greeting'
+
+def test_chat_falls_back_to_prebuilt_index(monkeypatch):
+    from routes import chat
+    index = IntentIndex(intents())
+    monkeypatch.setattr(chat, 'intent_batcher', None)
+    monkeypatch.setattr(chat, 'intent_index', index)
+    assert asyncio.run(chat.get_intent_response('bye now')) == 'Bye'
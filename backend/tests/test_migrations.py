@@ -0,0 +1,23 @@
+"""
+Startup migrations drop indexes made obsolete by newer composite indexes,
+with the DROP INDEX form each dialect accepts
+"""
+from sqlalchemy import create_engine, inspect, text
+
+from database.migrations import drop_index_sql, run_migrations
+
+def test_drop_index_sql_per_dialect():
+    assert drop_index_sql('mysql', 'assessments', 'ix_old') == 'DROP INDEX ix_old ON assessments'
+    assert drop_index_sql('sqlite', 'assessments', 'ix_old') == 'DROP INDEX ix_old'
+    assert drop_index_sql('postgresql', 'assessments', 'ix_old') == 'DROP INDEX ix_old'
+
+def test_old_database_is_migrated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE assessments (id INTEGER PRIMARY KEY, session_id VARCHAR)'))
+        conn.execute(text('CREATE INDEX ix_assessments_session_id ON assessments (session_id)'))
+    run_migrations(engine)
+    inspector = inspect(engine)
+    indexes = {index['name'] for index in inspector.get_indexes('assessments')}
+    assert 'ix_assessments_session_id' not in indexes
+    assert 'created_at' in {column['name'] for column in inspector.get_columns('assessments')}
@@ -0,0 +1,59 @@
+"""
+PDF job queue: start-up errors, bounded retries while the CPU executor is
+saturated, and expiry of finished jobs from the reports janitor
+"""
+import asyncio
+import time
+
+import pytest
+
+from utils import pdf_jobs as pdf_jobs_module
+from utils.executor import ExecutorSaturated
+from utils.pdf_cache import reports_janitor
+from utils.pdf_jobs import PDFJob, PDFJobQueue
+
+DOSHA_RESULTS = {'percentages': {'vata': 41.0, 'pitta': 37.0, 'kapha': 22.0}, 'dominant_dosha': 'vata'}
+RECS = {'therapy_details': [{'name': 'Basti', 'description': 'saturated-executor test'}]}
+
+def test_submit_before_start_is_a_clear_error():
+    with pytest.raises(RuntimeError, match="start"):
+        PDFJobQueue().submit({}, DOSHA_RESULTS, RECS)
+
+def test_job_fails_when_executor_stays_saturated(tmp_path, monkeypatch):
+    async def saturated(*args, **kwargs):
+        raise ExecutorSaturated("CPU executor queue is full")
+
+    monkeypatch.setattr(pdf_jobs_module, 'run_cpu', saturated)
+    queue = PDFJobQueue(workers=1, reports_dir=str(tmp_path), saturated_timeout=0.2)
+
+    async def run():
+        queue.start()
+        try:
+            job = queue.submit({}, DOSHA_RESULTS, RECS)
+            started = time.monotonic()
+            while job.status in ('queued', 'running') and time.monotonic() - started < 5:
+                await asyncio.sleep(0.02)
+            return job
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(run())
+    assert job.status == 'failed'
+    assert 'saturated' in job.error
+
+def test_janitor_expires_finished_jobs_past_unfinished_ones():
+    queue = PDFJobQueue(ttl_seconds=0)
+    queue.jobs['stuck'] = PDFJob('stuck', None)
+    for job_id in ('done-1', 'done-2'):
+        job = PDFJob(job_id, None)
+        job.status, job.finished_at = 'done', time.monotonic()
+        queue.jobs[job_id] = job
+        queue._finished.append((job.finished_at, job_id))
+
+    async def run_janitor():
+        janitor = asyncio.create_task(reports_janitor(interval=0.01, sweeps=(queue.expire,)))
+        await asyncio.sleep(0.1)
+        janitor.cancel()
+
+    asyncio.run(run_janitor())
+    assert list(queue.jobs) == ['stuck']
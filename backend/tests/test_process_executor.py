@@ -0,0 +1,53 @@
+"""
+Shared read-only recommendations, and scoring on a process pool
+(CPU_EXECUTOR_KIND=process) where results cross the process boundary by
+pickling
+"""
+import asyncio
+import copy
+import pickle
+
+import pytest
+
+from Training.panchakarma_model import FrozenDict, get_panchakarma_recommendations
+from utils.assessment_scoring import score_assessment
+from utils.executor import CPUExecutor
+
+ANSWERS = {
+    'body_frame': 'thin', 'skin_type': 'dry', 'hair_texture': 'thin', 'appetite': 'irregular',
+    'digestion': 'irregular', 'energy_level': 'variable', 'sleep': 'light', 'temperament': 'anxious',
+    'stress_response': 'worried', 'weather_preference': 'warm'
+}
+
+def test_recommendations_pickle_and_deepcopy_as_plain_dicts():
+    recs = get_panchakarma_recommendations({'dominant_dosha': 'vata', 'secondary_dosha': 'pitta',
+                                            'percentages': {'vata': 50, 'pitta': 35, 'kapha': 15}})
+    assert isinstance(recs, FrozenDict)
+    for clone in (pickle.loads(pickle.dumps(recs)), copy.deepcopy(recs)):
+        assert clone == recs
+        assert type(clone) is dict
+        clone['primary'] = ()  # copies are mutable
+
+def test_shared_recommendations_are_read_only():
+    # Behavior change: callers that edited the returned dict must copy it first
+    recs = get_panchakarma_recommendations({'dominant_dosha': 'kapha', 'secondary_dosha': None,
+                                            'percentages': {'vata': 20, 'pitta': 20, 'kapha': 60}})
+    with pytest.raises(TypeError):
+        recs['primary'] = ['Basti']
+    with pytest.raises(TypeError):
+        recs['dietary'].update(favor=())
+    with pytest.raises(AttributeError):
+        recs['primary'].append('Basti')  # lists are shared as tuples
+    editable = copy.deepcopy(recs)
+    editable['dietary']['favor'] = ['Honey']
+    assert get_panchakarma_recommendations({'dominant_dosha': 'kapha', 'percentages': {}}) == recs
+
+def test_score_assessment_on_process_pool():
+    executor = CPUExecutor(kind='process', max_workers=1)
+    try:
+        dosha_results, recs = asyncio.run(executor.run(score_assessment, ANSWERS))
+        assert (dosha_results, recs) == score_assessment(ANSWERS)
+        # The pool survives and keeps serving
+        assert asyncio.run(executor.run(score_assessment, ANSWERS))[0] == dosha_results
+    finally:
+        executor.shutdown()
@@ -0,0 +1,33 @@
+"""
+Read-through fills never replace a body written after the reader started
+"""
+from utils.response_cache import ResponseCache, etag_matches
+
+def test_fill_keeps_entry_put_while_read_was_in_flight():
+    cache = ResponseCache()
+    generation = cache.generation()
+    newer = cache.put('session', b'{"new":1}')
+    served = cache.fill('session', b'{"old":1}', generation)
+    assert served is newer
+    assert cache.get('session').body == b'{"new":1}'
+
+def test_fill_after_invalidate_is_not_cached():
+    cache = ResponseCache()
+    generation = cache.generation()
+    cache.invalidate('session')
+    served = cache.fill('session', b'{"old":1}', generation)
+    assert served.body == b'{"old":1}'
+    assert cache.get('session') is None
+
+def test_fill_other_keys_unaffected_by_writes():
+    cache = ResponseCache()
+    generation = cache.generation()
+    cache.put('other', b'{}')
+    cache.fill('session', b'{"stored":1}', generation)
+    assert cache.get('session').body == b'{"stored":1}'
+
+def test_etag_matching():
+    etag = ResponseCache().put('k', b'body').etag
+    assert etag_matches(f'W/{etag}, "other"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
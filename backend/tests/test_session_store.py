@@ -0,0 +1,48 @@
+"""
+Session stores: the database store upserts, so concurrent first saves of
+one session don't collide on the unique session_id
+"""
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Base
+from utils.chat_session import ChatSession
+from utils.session_store import DatabaseSessionStore, MemorySessionStore, SessionStore
+
+def test_session_store_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+def test_concurrent_first_saves_upsert(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}", connect_args={'timeout': 30})
+    Base.metadata.create_all(engine)
+    store = DatabaseSessionStore(sessionmaker(bind=engine))
+    errors = []
+
+    def save(question):
+        session = ChatSession(10)
+        session.current_question = question
+        try:
+            store.save('shared', session)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert store.count() == 1
+    assert store.get('shared').current_question in range(8)
+    engine.dispose()
+
+def test_memory_store_evicts_oldest_past_max_entries():
+    store = MemorySessionStore(max_entries=2)
+    for session_id in ('a', 'b', 'c'):
+        store.save(session_id, ChatSession(10))
+    assert store.get('a') is None and store.get('c') is not None
+    assert store.stats()['evictions'] == 1
@@ -0,0 +1,42 @@
+"""
+Startup time bounds from /health/startup, measured in a fresh interpreter
+with NLTK downloads and outbound connections blocked
+"""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+MAX_IMPORT_SECONDS = float(os.getenv('STARTUP_MAX_IMPORT_SECONDS', '10'))
+MAX_READY_SECONDS = float(os.getenv('STARTUP_MAX_READY_SECONDS', '10'))
+
+STARTUP_SCRIPT = '''
+import json, socket, nltk
+
+def offline(*args, **kwargs):
+    raise AssertionError("startup must not download or connect anywhere")
+
+nltk.download = offline
+socket.create_connection = offline
+
+from fastapi.testclient import TestClient
+from app import app
+
+with TestClient(app) as client:
+    print(json.dumps(client.get("/health/startup").json()))
+'''
+
+def test_startup_time_is_bounded_offline(tmp_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}", LOG_LEVEL='WARNING')
+    completed = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    startup = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    timings = startup['timings']
+    assert 0 < timings['import_seconds'] <= MAX_IMPORT_SECONDS
+    assert timings['import_seconds'] <= timings['ready_seconds'] <= MAX_READY_SECONDS
+    assert startup['warmup']['state'] != 'failed'
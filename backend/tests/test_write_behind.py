@@ -0,0 +1,78 @@
+"""
+Write-behind persistence: queued assessments stay readable until committed,
+and a full queue refuses rows instead of losing them silently
+"""
+import asyncio
+import threading
+
+from database.models import ChatMessage
+from database.write_behind import WriteBehindQueue, write_behind
+from utils.response_cache import assessment_cache
+from conftest import assessment_answers
+
+def calculate(client, session_id, answers):
+    response = client.post('/api/assessment/calculate', json={'session_id': session_id, 'assessment_data': answers})
+    assert response.status_code == 200
+    return response.json()
+
+def stored_result(body):
+    """The dosha fields GET /api/assessment returns (raw scores aren't stored)"""
+    dosha_results = body['dosha_results']
+    return dosha_results['percentages'], dosha_results['dominant_dosha'], dosha_results['secondary_dosha']
+
+def test_get_returns_assessment_whose_flush_is_in_flight(client, monkeypatch):
+    first = calculate(client, 'in-flight', assessment_answers(0))
+    client.portal.call(write_behind.flush)
+
+    started, release = threading.Event(), threading.Event()
+    write_batch = write_behind._write_batch
+
+    async def blocked_write_batch(batch):
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        await write_batch(batch)
+
+    monkeypatch.setattr(write_behind, '_write_batch', blocked_write_batch)
+    second = calculate(client, 'in-flight', assessment_answers(1))
+    assert second['dosha_results'] != first['dosha_results']
+    assessment_cache.clear()  # force the database path
+
+    client.portal.start_task_soon(write_behind.flush)
+    try:
+        assert started.wait(5)
+        # GET waits for the in-flight flush rather than reading around it
+        threading.Timer(0.2, release.set).start()
+        response = client.get('/api/assessment/in-flight')
+    finally:
+        release.set()
+    assert response.status_code == 200
+    assert stored_result(response.json()) == stored_result(second)
+
+def test_full_chat_queue_does_not_crowd_out_assessments():
+    queue = WriteBehindQueue(max_queue=2)
+    dosha_results = {'percentages': {'vata': 50.0, 'pitta': 30.0, 'kapha': 20.0},
+                     'dominant_dosha': 'vata', 'secondary_dosha': 'pitta'}
+
+    async def fill():
+        queue.start()
+        try:
+            accepted = [queue.add_chat_message('overflow', f'message {i}', 'user') for i in range(3)]
+            return accepted, queue.add_assessment('overflow', dosha_results, {})
+        finally:
+            queue._task.cancel()
+
+    accepted, row = asyncio.run(fill())
+    assert accepted == [True, True, False]
+    assert queue.latest_pending(ChatMessage, 'overflow')['message'] == 'message 1'
+    assert row is not None
+    assert queue.stats()['dropped'] == 1
+
+def test_dropped_assessment_returns_503_and_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(write_behind, 'max_queue', 0)
+    response = client.post('/api/assessment/calculate',
+                           json={'session_id': 'dropped', 'assessment_data': assessment_answers(0)})
+    assert response.status_code == 503
+    assert assessment_cache.get('dropped') is None
+    monkeypatch.undo()
+    assert client.get('/api/assessment/dropped').status_code == 404
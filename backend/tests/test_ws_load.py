@@ -0,0 +1,21 @@
+"""
+Load-test latency percentiles: each sample lands in the 1% bucket that
+contains it, on both sides of 1 second
+"""
+import pytest
+
+from benchmarks.ws_load import LatencyRecorder
+
+@pytest.mark.parametrize('seconds', [0.0005, 0.0123, 0.2339, 0.999, 1.0, 1.5, 42.0])
+def test_percentile_brackets_the_sample(seconds):
+    recorder = LatencyRecorder()
+    recorder.record(seconds)
+    recorder.record(seconds * 10)
+    # The bucket's upper edge, within one bucket width above the sample
+    assert seconds <= recorder.percentile(0.5) <= seconds * 1.01
+
+def test_percentile_never_exceeds_max():
+    recorder = LatencyRecorder()
+    for seconds in (0.1, 0.2, 0.230493):
+        recorder.record(seconds)
+    assert recorder.percentile(0.99) == recorder.max
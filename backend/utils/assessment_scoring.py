@@ -0,0 +1,237 @@
+"""
+Assessment Scoring
+Single entry point for turning assessment answers into dosha results and
+Panchakarma recommendations, shared by the chat and REST routes
+
+The chat assessment has a finite answer space (a few options per question),
+so scores for complete assessments can be served from a precomputed table
+keyed by the packed answer tuple instead of being recalculated.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from Training.prakritimodel import (
+    calculate_dosha_scores, dosha_results_from_scores, get_scoring_engine, weights_version, DOSHA_ORDER
+)
+from Training.panchakarma_model import freeze, get_panchakarma_recommendations
+from utils.metrics import stage
+
+# 'off', 'lazy' (bounded LRU filled on demand) or 'full' (whole answer space
+# materialized into a compact array at startup)
+ASSESSMENT_CACHE_MODE = os.getenv('ASSESSMENT_CACHE_MODE', 'lazy')
+ASSESSMENT_CACHE_MAX_ENTRIES = int(os.getenv('ASSESSMENT_CACHE_MAX_ENTRIES', '8192'))
+
+class AssessmentResultCache:
+    """
+    Raw dosha scores for complete assessments, keyed by packed answers
+
+    Each question's distinct dosha values get a digit, and a complete
+    assessment packs into one mixed-radix integer. Assessments with missing,
+    extra or unknown answers are not cached and are scored directly.
+
+    The final (dosha_results, panchakarma_recs) pair is cached per distinct
+    score triple, which many answer combinations share, so a hit is two
+    lookups with nothing recomputed.
+    """
+
+    def __init__(self, questions, option_mapping, mode=ASSESSMENT_CACHE_MODE,
+                 max_entries=ASSESSMENT_CACHE_MAX_ENTRIES):
+        if mode not in ('off', 'lazy', 'full'):
+            raise ValueError(f"Unknown assessment cache mode: {mode}")
+        self.mode = mode
+        self.max_entries = max_entries
+        self.question_ids = [question['id'] for question in questions]
+        self.values = []  # per question: distinct dosha values in option order
+        for question in questions:
+            mapping = option_mapping.get(question['id'], {})
+            mapped = [mapping.get(option, option.lower()) for option in question['options']]
+            self.values.append(list(dict.fromkeys(mapped)))
+        self.value_digit = [{value: d for d, value in enumerate(values)} for values in self.values]
+
+        self.radices = [len(values) for values in self.values]
+        self.multipliers = []
+        multiplier = 1
+        for radix in reversed(self.radices):
+            self.multipliers.append(multiplier)
+            multiplier *= radix
+        self.multipliers.reverse()
+        self.size = multiplier
+
+        self._lock = threading.Lock()
+        self._table = None  # full mode: (size x 3) uint16 raw scores
+        self._lru = OrderedDict()  # lazy mode: key -> (vata, pitta, kapha)
+        self._results = {}  # (vata, pitta, kapha) -> read-only (dosha_results, panchakarma_recs)
+        self._version = weights_version()
+        self.hits = 0
+        self.misses = 0
+
+    def pack(self, assessment_data):
+        """Packed integer key for a complete assessment, or None if uncacheable"""
+        if len(assessment_data) != len(self.question_ids):
+            return None
+        key = 0
+        for question_id, digits, multiplier in zip(self.question_ids, self.value_digit, self.multipliers):
+            try:
+                digit = digits.get(assessment_data[question_id])
+            except (KeyError, TypeError):
+                return None
+            if digit is None:
+                return None
+            key += digit * multiplier
+        return key
+
+    def _check_version(self):
+        if self._version != weights_version():
+            with self._lock:
+                self._table = None
+                self._lru.clear()
+                self._results.clear()
+                self._version = weights_version()
+            if self.mode == 'full':
+                self.materialize()
+
+    def materialize(self):
+        """Score the entire answer space with one vectorized pass (full mode)"""
+        engine = get_scoring_engine()
+        version = weights_version()
+        # Map each question digit to the engine's option index for that value
+        lookups = [
+            np.array([engine.option_index.get(question_id, {}).get(value, 0) for value in values], dtype=np.intp)
+            for question_id, values in zip(self.question_ids, self.values)
+        ]
+        digits = np.indices(self.radices).reshape(len(self.radices), -1)
+        encoded = np.zeros((self.size, len(engine.questions)), dtype=np.intp)
+        for q, question_id in enumerate(self.question_ids):
+            position = engine.question_position.get(question_id)
+            if position is not None:
+                encoded[:, position] = lookups[q][digits[q]]
+        table = engine.score_encoded(encoded).astype(np.uint16)
+        with self._lock:
+            self._table = table
+            self._version = version
+        return table
+
+    def scores(self, assessment_data):
+        """Raw (vata, pitta, kapha) scores via the cache, or None if uncacheable"""
+        if self.mode == 'off':
+            return None
+        key = self.pack(assessment_data)
+        if key is None:
+            return None
+        self._check_version()
+
+        table = self._table
+        if table is not None:
+            self.hits += 1
+            return tuple(table[key].tolist())
+
+        with self._lock:
+            cached = self._lru.get(key)
+            if cached is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return cached
+        self.misses += 1
+        computed = calculate_dosha_scores(assessment_data)['scores']
+        cached = tuple(computed[dosha] for dosha in DOSHA_ORDER)
+        with self._lock:
+            self._lru[key] = cached
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+        return cached
+
+    def result(self, assessment_data):
+        """Read-only (dosha_results, panchakarma_recs) via the cache, or None if uncacheable"""
+        scores = self.scores(assessment_data)
+        if scores is None:
+            return None
+        cached = self._results.get(scores)
+        if cached is None:
+            version = self._version
+            dosha_results = freeze(dosha_results_from_scores(dict(zip(DOSHA_ORDER, scores))))
+            cached = (dosha_results, get_panchakarma_recommendations(dosha_results))
+            with self._lock:
+                # Score triples are bounded by the weights, but cap anyway
+                if self._version == version and len(self._results) < self.max_entries:
+                    self._results[scores] = cached
+        return cached
+
+    def dosha_results(self, assessment_data):
+        """Read-only dosha results via the cache, or None if uncacheable"""
+        scores = self.scores(assessment_data)
+        if scores is None:
+            return None
+        cached = self._results.get(scores)
+        if cached is not None:
+            return cached[0]
+        return freeze(dosha_results_from_scores(dict(zip(DOSHA_ORDER, scores))))
+
+    def stats(self):
+        return {
+            'mode': self.mode,
+            'answer_space': self.size,
+            'materialized': self._table is not None,
+            'table_bytes': self._table.nbytes if self._table is not None else 0,
+            'lru_entries': len(self._lru),
+            'result_entries': len(self._results),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+DOSHA_SCORING_SECONDS = stage('calculate_dosha_scores')
+RECOMMENDATIONS_SECONDS = stage('get_panchakarma_recommendations')
+
+result_cache = None
+
+def configure_result_cache(questions, option_mapping, mode=ASSESSMENT_CACHE_MODE,
+                           max_entries=ASSESSMENT_CACHE_MAX_ENTRIES):
+    """Install the result cache for an assessment question table"""
+    global result_cache
+    result_cache = AssessmentResultCache(questions, option_mapping, mode, max_entries)
+    return result_cache
+
+def score_assessment(assessment_data):
+    """
+    Score an assessment and look up its therapy recommendations
+
+    Args:
+        assessment_data: Dictionary with question-answer pairs
+
+    Returns:
+        Tuple of (dosha_results, panchakarma_recs); both read-only when
+        served from the result cache
+    """
+    started = time.perf_counter()
+    cached = result_cache.result(assessment_data) if result_cache is not None else None
+    if cached is not None:
+        # Recorded as scoring only; the recommendations came with the result
+        DOSHA_SCORING_SECONDS.observe(time.perf_counter() - started)
+        return cached
+    dosha_results = calculate_dosha_scores(assessment_data)
+    scored = time.perf_counter()
+    panchakarma_recs = get_panchakarma_recommendations(dosha_results)
+    DOSHA_SCORING_SECONDS.observe(scored - started)
+    RECOMMENDATIONS_SECONDS.observe(time.perf_counter() - scored)
+    return dosha_results, panchakarma_recs
+
+def score_dosha(assessment_data):
+    """
+    Score an assessment without looking up recommendations
+
+    For callers that only need the dosha results (the REST route splices in
+    the recommendations from their cached serialized form).
+
+    Returns:
+        Dictionary with dosha scores, percentages and dominant/secondary
+        doshas; read-only when served from the result cache
+    """
+    started = time.perf_counter()
+    dosha_results = result_cache.dosha_results(assessment_data) if result_cache is not None else None
+    if dosha_results is None:
+        dosha_results = calculate_dosha_scores(assessment_data)
+    DOSHA_SCORING_SECONDS.observe(time.perf_counter() - started)
+    return dosha_results
@@ -0,0 +1,90 @@
+"""
+Compact Chat Session State
+Slotted per-session state: answers are option indices rather than strings,
+results are raw scores, and recommendations are referenced by key instead
+of holding a copy of the therapy text
+"""
+import sys
+from Training.prakritimodel import dosha_results_from_scores
+from Training.panchakarma_model import get_recommendations_for_key
+
+DOSHAS = ('vata', 'pitta', 'kapha')
+
+class ChatSession:
+    __slots__ = (
+        'answers',
+        'current_question',
+        'assessment_complete',
+        'has_sent_welcome',
+        'pacing',
+        'dosha_scores',
+        'recs_key'
+    )
+
+    def __init__(self, question_count):
+        # One byte per question: 0 = unanswered, otherwise option index + 1
+        self.answers = bytearray(question_count)
+        self.current_question = 0
+        self.assessment_complete = False
+        self.has_sent_welcome = False  # Track if welcome message was sent
+        self.pacing = None  # Pacing mode override; None uses the deployment default
+        self.dosha_scores = None  # (vata, pitta, kapha) raw scores once complete
+        self.recs_key = None  # panchakarma_model.recommendation_key() once complete
+
+    def record_answer(self, question_index, option_index):
+        self.answers[question_index] = option_index + 1
+
+    def answered_options(self):
+        """Yield (question_index, option_index) for each answered question"""
+        for question_index, answer in enumerate(self.answers):
+            if answer:
+                yield question_index, answer - 1
+
+    def reset_assessment(self):
+        self.answers = bytearray(len(self.answers))
+        self.current_question = 0
+
+    def complete(self, dosha_results, recs_key):
+        scores = dosha_results['scores']
+        self.dosha_scores = tuple(scores[dosha] for dosha in DOSHAS)
+        self.recs_key = recs_key
+        self.assessment_complete = True
+
+    @property
+    def dosha_results(self):
+        if self.dosha_scores is None:
+            return None
+        return dosha_results_from_scores(dict(zip(DOSHAS, self.dosha_scores)))
+
+    @property
+    def panchakarma_recs(self):
+        if self.recs_key is None:
+            return None
+        return get_recommendations_for_key(self.recs_key)
+
+    def to_dict(self):
+        """JSON-serializable form for persistent session stores"""
+        return {
+            'answers': list(self.answers),
+            'current_question': self.current_question,
+            'assessment_complete': self.assessment_complete,
+            'has_sent_welcome': self.has_sent_welcome,
+            'pacing': self.pacing,
+            'dosha_scores': list(self.dosha_scores) if self.dosha_scores else None,
+            'recs_key': list(self.recs_key) if self.recs_key else None
+        }
+
+    @classmethod
+    def from_dict(cls, data, question_count=0):
+        answers = data.get('answers') or [0] * question_count
+        session = cls(len(answers))
+        session.answers = bytearray(answers)
+        session.current_question = data.get('current_question', 0)
+        session.assessment_complete = data.get('assessment_complete', False)
+        session.has_sent_welcome = data.get('has_sent_welcome', False)
+        session.pacing = sys.intern(data['pacing']) if data.get('pacing') else None
+        if data.get('dosha_scores'):
+            session.dosha_scores = tuple(data['dosha_scores'])
+        if data.get('recs_key'):
+            session.recs_key = tuple(sys.intern(name) if name else None for name in data['recs_key'])
+        return session
@@ -0,0 +1,131 @@
+"""
+CPU Executor Layer
+Runs CPU-bound work (NLP, model inference, dosha scoring, PDF builds) off
+the asyncio event loop on a bounded thread or process pool
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# 'thread' or 'process'; process pools need picklable, module-level callables
+CPU_EXECUTOR_KIND = os.getenv('CPU_EXECUTOR_KIND', 'thread')
+CPU_EXECUTOR_WORKERS = int(os.getenv('CPU_EXECUTOR_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Tasks allowed to wait for a worker before submissions are rejected
+CPU_EXECUTOR_MAX_QUEUE = int(os.getenv('CPU_EXECUTOR_MAX_QUEUE', '64'))
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor queue is full and the caller should back off"""
+
+def _timed_call(fn, args, kwargs):
+    # time.time() rather than perf_counter so timestamps are comparable
+    # between the event loop process and pool worker processes
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return result, started, time.time()
+
+class CPUExecutor:
+    def __init__(self, kind=CPU_EXECUTOR_KIND, max_workers=CPU_EXECUTOR_WORKERS,
+                 max_queue=CPU_EXECUTOR_MAX_QUEUE):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'queue_wait_seconds': 0.0,
+            'execution_seconds': 0.0,
+            'max_queue_wait_seconds': 0.0
+        }
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == 'process':
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='cpu-worker')
+        return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result
+
+        Raises:
+            ExecutorSaturated: when every worker is busy and the queue is full
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._counters['rejected'] += 1
+                raise ExecutorSaturated(
+                    f"CPU executor saturated ({self._in_flight} tasks in flight)"
+                )
+            self._in_flight += 1
+            self._counters['submitted'] += 1
+
+        submitted = time.time()
+        try:
+            future = self._get_pool().submit(_timed_call, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+                self._counters['failed'] += 1
+            raise
+        # Released when the work itself finishes, not when the awaiting task
+        # does: a cancelled caller (client disconnect) leaves the worker busy
+        future.add_done_callback(lambda done: self._release(done, submitted))
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    def _release(self, future, submitted):
+        with self._lock:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._counters['failed'] += 1
+                return
+            _, started, finished = future.result()
+            queue_wait = max(0.0, started - submitted)
+            self._counters['completed'] += 1
+            self._counters['queue_wait_seconds'] += queue_wait
+            self._counters['execution_seconds'] += finished - started
+            if queue_wait > self._counters['max_queue_wait_seconds']:
+                self._counters['max_queue_wait_seconds'] = queue_wait
+
+    def stats(self):
+        """Queue depth and cumulative queue-wait versus execution time"""
+        with self._lock:
+            counters = dict(self._counters)
+            in_flight = self._in_flight
+        completed = counters['completed'] or 1
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'in_flight': in_flight,
+            'queued': max(0, in_flight - self.max_workers),
+            **counters,
+            'avg_queue_wait_seconds': counters['queue_wait_seconds'] / completed,
+            'avg_execution_seconds': counters['execution_seconds'] / completed
+        }
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+cpu_executor = CPUExecutor()
+
+async def run_cpu(fn, *args, **kwargs):
+    """Dispatch CPU-bound work through the shared executor"""
+    return await cpu_executor.run(fn, *args, **kwargs)
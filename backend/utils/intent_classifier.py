@@ -0,0 +1,102 @@
+"""
+Micro-batching Intent Classifier
+Groups chat messages arriving within a few milliseconds into one vectorized
+predict_proba call on the trained TF-IDF + MultinomialNB pipeline, run on
+the shared CPU executor
+"""
+import asyncio
+import os
+
+import numpy as np
+
+from utils.executor import run_cpu
+from utils.metrics import stage
+
+# Flush a batch once it holds this many messages or its oldest message has
+# waited this long, whichever comes first
+BATCH_MAX_SIZE = int(os.getenv('INTENT_BATCH_MAX_SIZE', '64'))
+BATCH_MAX_WAIT_MS = float(os.getenv('INTENT_BATCH_MAX_WAIT_MS', '2'))
+
+INTENT_PREDICT_SECONDS = stage('intent_predict')
+
+def _classify(model, preprocess, texts):
+    # Module-level so it can be shipped to a process pool worker
+    if preprocess is not None:
+        texts = [preprocess(text) for text in texts]
+    with INTENT_PREDICT_SECONDS.time():
+        probabilities = model.predict_proba(texts)
+    best = probabilities.argmax(axis=1)
+    tags = model.classes_[best]
+    confidences = probabilities[np.arange(len(best)), best]
+    return [(str(tag), float(confidence)) for tag, confidence in zip(tags, confidences)]
+
+class IntentBatcher:
+    def __init__(self, model, preprocess=None, max_batch_size=BATCH_MAX_SIZE,
+                 max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.model = model
+        self.preprocess = preprocess
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle = None
+        self._tasks = set()
+        self.stats = {'batches': 0, 'messages': 0, 'max_batch': 0}
+
+    async def classify_many(self, texts):
+        """
+        Classify texts on the CPU executor in chunks of max_batch_size
+
+        Chunks are dispatched one at a time, so a bulk request takes its
+        turn with chat batches and is subject to executor backpressure
+        (ExecutorSaturated) instead of holding a worker for the whole list.
+
+        Returns:
+            List of (intent_tag, confidence) tuples in input order
+        """
+        texts = list(texts)
+        results = []
+        for start in range(0, len(texts), self.max_batch_size):
+            chunk = texts[start:start + self.max_batch_size]
+            results += await run_cpu(_classify, self.model, self.preprocess, chunk)
+        return results
+
+    async def classify(self, text):
+        """Queue one text for the next batch and wait for its (tag, confidence)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch):
+        texts = [text for text, _ in batch]
+        self.stats['batches'] += 1
+        self.stats['messages'] += len(batch)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
+        try:
+            # Preprocessing and inference both run on the CPU executor; with a
+            # process pool the model is pickled along with each batch
+            results = await run_cpu(_classify, self.model, self.preprocess, texts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
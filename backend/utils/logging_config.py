@@ -0,0 +1,131 @@
+"""
+Structured Logging
+Non-blocking logging setup: request code only puts records on an in-memory
+queue, and a background QueueListener thread formats and writes them, so a
+slow stdout pipe never stalls the event loop
+
+Configuration (environment):
+    LOG_LEVEL           root level (default INFO)
+    LOG_LEVELS          per-logger levels, e.g. "routes.chat=DEBUG,utils.pdf_jobs=WARNING"
+    LOG_FORMAT          'json' (default) or 'text'
+    LOG_SAMPLE_RATES    fraction of DEBUG records kept per logger, e.g. "routes.chat=0.01"
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+def parse_mapping(value):
+    """Parse "name=value,name=value" into a dict"""
+    mapping = {}
+    for item in value.split(','):
+        if '=' in item:
+            name, _, setting = item.partition('=')
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the message, logger, level and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records for the configured loggers
+
+    Rates apply to a logger and its children; the most specific name wins.
+    Records above DEBUG always pass.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {name: float(rate) for name, rate in rates.items()}
+
+    def rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.rates.get('', 1.0)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or not self.rates:
+            return True
+        return random.random() < self.rate_for(record.name)
+
+class _LocalQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # Records are consumed in-process, so skip the default message merge
+        # and pickling prep; formatting happens on the listener thread.
+        return record
+
+_listener = None
+
+def configure_logging(level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT, sample_rates=LOG_SAMPLE_RATES,
+                      stream=None):
+    """
+    Route all logging through a queue to a background writer thread
+
+    Safe to call more than once; later calls replace the previous setup.
+
+    Returns:
+        The running QueueListener
+    """
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == 'json':
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    handler = _LocalQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(parse_mapping(sample_rates) if isinstance(sample_rates, str) else sample_rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    for name, logger_level in (parse_mapping(levels) if isinstance(levels, str) else levels).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def stop_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
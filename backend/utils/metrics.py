@@ -0,0 +1,163 @@
+"""
+Metrics Registry
+In-process latency histograms and gauges rendered in the Prometheus text
+exposition format at /metrics
+
+Recording is meant to stay on permanently: an observation is one bisect
+over the bucket bounds plus two additions, with no locks. Under threads an
+increment can occasionally be lost, which is acceptable for monitoring.
+Stages that run on the CPU executor are only recorded when it is a thread
+pool (CPU_EXECUTOR_KIND=thread, the default); process pool workers keep
+their own registry.
+"""
+import time
+from bisect import bisect_left
+
+# Seconds; covers sub-microsecond cache hits up to multi-second PDF builds
+DEFAULT_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+class HistogramSeries:
+    """One labelled series of a histogram; observe() is the hot path"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'labels')
+
+    def __init__(self, bounds, labels):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.labels = labels
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self):
+        """
+        Context manager recording the duration of its block
+
+        Costs a little over a microsecond; hot paths call observe() with
+        their own perf_counter() readings instead.
+        """
+        return _Timer(self)
+
+    def render(self, name):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            cumulative += count
+            labels = _format_labels(self.labels + (('le', _format_value(bound)),))
+            lines.append(f'{name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labels)
+        lines.append(f'{name}_sum{labels} {_format_value(self.sum)}')
+        lines.append(f'{name}_count{labels} {cumulative}')
+        return lines
+
+class _Timer:
+    __slots__ = ('series', 'started')
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.started)
+
+class Histogram:
+    """Latency histogram; call labels() once at import and keep the series"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = HistogramSeries(self.buckets, tuple(zip(self.label_names, key)))
+        return series
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def collect(self):
+        lines = []
+        for series in list(self._series.values()):
+            lines.extend(series.render(self.name))
+        return lines
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    type = 'gauge'
+
+    def __init__(self, name, help_text, callback):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def collect(self):
+        return [f'{self.name} {_format_value(self.callback())}']
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        existing = self._metrics.get(name)
+        if existing is not None:
+            return existing
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def gauge(self, name, help_text, callback):
+        return self.register(Gauge(name, help_text, callback))
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            try:
+                lines.extend(metric.collect())
+            except Exception:
+                # A failing gauge callback shouldn't break the whole scrape
+                continue
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+# Per-stage latency; each instrumented module binds its stage series once
+STAGE_SECONDS = registry.histogram(
+    'ayursutra_stage_seconds',
+    'Latency of backend processing stages in seconds',
+    label_names=('stage',)
+)
+
+def stage(name):
+    """Histogram series for one processing stage"""
+    return STAGE_SECONDS.labels(name)
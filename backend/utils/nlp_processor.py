@@ -1,83 +1,285 @@
+import logging
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import pickle
+import threading
+import time
+from functools import lru_cache
 import os
+from utils.stopwords import ENGLISH_STOPWORDS
+from utils.metrics import stage
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# NLTK resources are resolved lazily from local data only. Nothing here ever
+# downloads: run setup.py (or download_nlp_data) to fetch the corpora, and
+# until they are present a whitespace tokenizer and identity lemmatizer are
+# used instead.
+stop_words = ENGLISH_STOPWORDS
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+logger = logging.getLogger(__name__)
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet', quiet=True)
+_tokenize = None
+_lemmatize = None
+_resource_names = {'tokenizer': None, 'lemmatizer': None}
+_init_lock = threading.Lock()
 
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger', quiet=True)
+# Seconds spent on each bootstrap step, e.g. STARTUP_TIMINGS['nlp_resources']
+STARTUP_TIMINGS = {}
 
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words('english'))
+def _simple_tokenize(text):
+    """Fallback tokenizer; clean_text leaves only letters and whitespace"""
+    return text.split()
 
-def clean_text(text):
-    """Clean and preprocess text for NLP"""
+def _identity_lemmatize(token):
+    return token
+
+def _nltk_resource_available(path):
+    try:
+        import nltk
+        nltk.data.find(path)
+        return True
+    except (ImportError, LookupError):
+        return False
+
+def _load_resources():
+    global _tokenize, _lemmatize
+    started = time.perf_counter()
+
+    tokenize, tokenizer_name = _simple_tokenize, 'whitespace'
+    if _nltk_resource_available('tokenizers/punkt'):
+        from nltk.tokenize import word_tokenize
+        tokenize, tokenizer_name = word_tokenize, 'nltk.word_tokenize'
+
+    lemmatize, lemmatizer_name = _identity_lemmatize, 'identity'
+    if _nltk_resource_available('corpora/wordnet'):
+        from nltk.stem import WordNetLemmatizer
+        wordnet = WordNetLemmatizer()
+        wordnet.lemmatize('warmup')  # Force the lazy WordNet corpus load now
+        lemmatize, lemmatizer_name = wordnet.lemmatize, 'nltk.WordNetLemmatizer'
+
+    # A tokenizer or lemmatizer installed explicitly always wins
+    if _lemmatize is None and lemmatize is _identity_lemmatize:
+        # The intent model was trained on lemmatized text, so its features drift
+        logger.warning("WordNet corpus not found; lemmatization disabled (run setup.py to download it)")
+    if _tokenize is None and tokenize is _simple_tokenize:
+        logger.warning("punkt tokenizer not found; using whitespace tokenization (run setup.py to download it)")
+    if _tokenize is None:
+        _tokenize = tokenize
+        _resource_names['tokenizer'] = tokenizer_name
+    if _lemmatize is None:
+        _lemmatize = lemmatize
+        _resource_names['lemmatizer'] = lemmatizer_name
+
+    STARTUP_TIMINGS['nlp_resources'] = time.perf_counter() - started
+
+def _ensure_resources():
+    if _tokenize is None or _lemmatize is None:
+        with _init_lock:
+            if _tokenize is None or _lemmatize is None:
+                _load_resources()
+
+def set_tokenizer(tokenize, name=None):
+    """Install a custom tokenizer: callable(str) -> list of tokens"""
+    global _tokenize
+    with _init_lock:
+        _tokenize = tokenize
+        _resource_names['tokenizer'] = name or getattr(tokenize, '__name__', repr(tokenize))
+    clear_caches()
+
+def set_lemmatizer(lemmatize, name=None):
+    """Install a custom lemmatizer: callable(token) -> lemma"""
+    global _lemmatize
+    with _init_lock:
+        _lemmatize = lemmatize
+        _resource_names['lemmatizer'] = name or getattr(lemmatize, '__name__', repr(lemmatize))
+    clear_caches()
+
+def warmup():
+    """Resolve NLP resources ahead of the first request (safe to run in a thread)"""
+    started = time.perf_counter()
+    _ensure_resources()
+    clean_text('warmup')
+    STARTUP_TIMINGS['nlp_warmup'] = time.perf_counter() - started
+
+def nlp_status():
+    """Report which tokenizer and lemmatizer are active"""
+    return {
+        'ready': _tokenize is not None and _lemmatize is not None,
+        # True while a fallback differs from the preprocessing the model was trained with
+        'degraded': _resource_names['tokenizer'] == 'whitespace' or _resource_names['lemmatizer'] == 'identity',
+        'tokenizer': _resource_names['tokenizer'],
+        'lemmatizer': _resource_names['lemmatizer'],
+        'timings': dict(STARTUP_TIMINGS)
+    }
+
+def download_nlp_data(quiet=True):
+    """Explicitly download the NLTK corpora used here (never called implicitly)"""
+    import nltk
+    for package in ('punkt', 'wordnet'):
+        nltk.download(package, quiet=quiet)
+
+def tokenize(text):
+    """Tokenize text with the active tokenizer"""
+    _ensure_resources()
+    return _tokenize(text)
+
+# Chat input is highly repetitive (button labels, "start", "yes"), so cleaned
+# text and per-token lemmas are memoized in bounded LRU caches. Sizes come
+# from the environment and can be changed at runtime with configure_caches.
+CLEAN_TEXT_CACHE_SIZE = int(os.getenv('NLP_CLEAN_TEXT_CACHE_SIZE', '4096'))
+LEMMA_CACHE_SIZE = int(os.getenv('NLP_LEMMA_CACHE_SIZE', '8192'))
+
+def _lemmatize_token(token):
+    return _lemmatize(token)
+
+def _clean_text(text):
+    _ensure_resources()
     text = text.lower()
     text = re.sub(r'[^a-zA-Z\s]', '', text)
-    tokens = word_tokenize(text)
-    tokens = [lemmatizer.lemmatize(token) for token in tokens if token not in stop_words]
+    tokens = _tokenize(text)
+    tokens = [_lemma_cache(token) for token in tokens if token not in stop_words]
     return ' '.join(tokens)
 
+_clean_text_cache = lru_cache(maxsize=CLEAN_TEXT_CACHE_SIZE)(_clean_text)
+_lemma_cache = lru_cache(maxsize=LEMMA_CACHE_SIZE)(_lemmatize_token)
+
+def configure_caches(clean_text_size=None, lemma_size=None):
+    """Resize the clean_text and lemma caches (resizing empties them)"""
+    global _clean_text_cache, _lemma_cache
+    if clean_text_size is not None:
+        _clean_text_cache = lru_cache(maxsize=clean_text_size)(_clean_text)
+    if lemma_size is not None:
+        _lemma_cache = lru_cache(maxsize=lemma_size)(_lemmatize_token)
+
+def clear_caches():
+    """Drop memoized results, e.g. after swapping tokenizer or lemmatizer"""
+    _clean_text_cache.cache_clear()
+    _lemma_cache.cache_clear()
+
+def cache_stats():
+    """Hit/miss counters and occupancy for the NLP caches"""
+    stats = {}
+    for name, cache in (('clean_text', _clean_text_cache), ('lemma', _lemma_cache)):
+        info = cache.cache_info()
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize
+        }
+    return stats
+
+CLEAN_TEXT_SECONDS = stage('clean_text')
+
+def clean_text(text):
+    """Clean and preprocess text for NLP (memoized)"""
+    started = time.perf_counter()
+    cleaned = _clean_text_cache(text)
+    CLEAN_TEXT_SECONDS.observe(time.perf_counter() - started)
+    return cleaned
+
 def extract_keywords(text):
     """Extract keywords from user input"""
-    cleaned = clean_text(text)
-    tokens = word_tokenize(cleaned)
-    return tokens
+    # clean_text already joins tokens with single spaces
+    return clean_text(text).split()
+
+class IntentIndex:
+    """
+    Inverted index over intent patterns for fast keyword matching
+
+    Patterns are cleaned once at build time and stored as token sets; each
+    token maps to the ordinals of the patterns containing it, so matching
+    only scores patterns that share at least one token with the input.
+    """
+
+    def __init__(self, intents_data):
+        self.intents = list(intents_data)
+        self.entries = []  # (intent, pattern_words) in original iteration order
+        self.postings = {}
+
+        for intent in self.intents:
+            for pattern in intent.get('patterns', []):
+                pattern_words = frozenset(clean_text(pattern).split())
+                ordinal = len(self.entries)
+                self.entries.append((intent, pattern_words))
+                for word in pattern_words:
+                    self.postings.setdefault(word, []).append(ordinal)
+
+    def match(self, user_input, threshold=0.3):
+        """Return the best matching intent for user_input, or None"""
+        input_words = set(clean_text(user_input).split())
+
+        # Count shared tokens per candidate pattern
+        common_counts = {}
+        for word in input_words:
+            for ordinal in self.postings.get(word, ()):
+                common_counts[ordinal] = common_counts.get(ordinal, 0) + 1
+
+        best_match = None
+        best_score = 0
+
+        # Visit candidates in pattern order so ties resolve as a linear scan would
+        for ordinal in sorted(common_counts):
+            intent, pattern_words = self.entries[ordinal]
+            score = common_counts[ordinal] / max(len(input_words), len(pattern_words))
+            if score > best_score:
+                best_score = score
+                best_match = intent
+
+        return best_match if best_score > threshold else None
+
+
+# Index for the raw intent list most recently passed to match_intent, as
+# (intents list, intents_fingerprint(), IntentIndex). A single slot: callers
+# share one intents list, and a different list replaces it.
+_intent_index_slot = None
+
+def intents_fingerprint(intents_data):
+    """The parts of an intents list an IntentIndex is built from"""
+    return tuple((id(intent), tuple(intent.get('patterns', ()))) for intent in intents_data)
+
+def build_intent_index(intents_data, refresh=False):
+    """
+    Build (or fetch the cached) IntentIndex for a list of intents
+
+    The cached index is reused for the same list object without walking its
+    patterns. Pass refresh=True after reloading or editing the list in place
+    to rebuild it if its patterns changed.
+    """
+    global _intent_index_slot
+    if isinstance(intents_data, IntentIndex):
+        return intents_data
+    slot = _intent_index_slot
+    if slot is not None and slot[0] is intents_data:
+        if not refresh:
+            return slot[2]
+        fingerprint = intents_fingerprint(intents_data)
+        if slot[1] == fingerprint:
+            return slot[2]
+    else:
+        fingerprint = intents_fingerprint(intents_data)
+    index = IntentIndex(intents_data)
+    _intent_index_slot = (intents_data, fingerprint, index)
+    return index
 
 def match_intent(user_input, intents_data):
-    """Simple intent matching based on keywords"""
-    cleaned_input = clean_text(user_input)
-    input_words = set(cleaned_input.split())
-    
-    best_match = None
-    best_score = 0
-    
-    for intent in intents_data:
-        patterns = intent.get('patterns', [])
-        for pattern in patterns:
-            pattern_words = set(clean_text(pattern).split())
-            # Calculate similarity
-            common_words = input_words.intersection(pattern_words)
-            if common_words:
-                score = len(common_words) / max(len(input_words), len(pattern_words))
-                if score > best_score:
-                    best_score = score
-                    best_match = intent
-    
-    return best_match if best_score > 0.3 else None
+    """Simple intent matching based on keywords
+
+    intents_data may be a list of intents or a prebuilt IntentIndex; a raw
+    list is indexed on first use and reused afterwards (see
+    build_intent_index for in-place edits). Prefer passing an IntentIndex.
+    """
+    return build_intent_index(intents_data).match(user_input)
+
+DOSHA_KEYWORDS = {
+    'vata': ['thin', 'light', 'dry', 'cold', 'irregular', 'anxious', 'creative', 'quick'],
+    'pitta': ['medium', 'warm', 'oily', 'sharp', 'intense', 'ambitious', 'irritable', 'perfectionist'],
+    'kapha': ['heavy', 'thick', 'smooth', 'slow', 'calm', 'stable', 'grounded', 'loving']
+}
 
 def extract_dosha_keywords(text):
     """Extract dosha-related keywords from text"""
-    dosha_keywords = {
-        'vata': ['thin', 'light', 'dry', 'cold', 'irregular', 'anxious', 'creative', 'quick'],
-        'pitta': ['medium', 'warm', 'oily', 'sharp', 'intense', 'ambitious', 'irritable', 'perfectionist'],
-        'kapha': ['heavy', 'thick', 'smooth', 'slow', 'calm', 'stable', 'grounded', 'loving']
-    }
-    
     cleaned = clean_text(text)
     found_doshas = []
     
-    for dosha, keywords in dosha_keywords.items():
+    for dosha, keywords in DOSHA_KEYWORDS.items():
         for keyword in keywords:
             if keyword in cleaned:
                 found_doshas.append(dosha)
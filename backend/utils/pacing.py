@@ -0,0 +1,64 @@
+"""
+Chat Response Pacing
+Server-side policy for how long the bot "types" before a reply is sent
+"""
+import asyncio
+import os
+
+PACING_MODES = ('off', 'fixed', 'proportional')
+
+class PacingPolicy:
+    """
+    Minimum time between receiving a message and sending the reply
+
+    Modes:
+        off: send as soon as the reply is ready
+        fixed: at least fixed_seconds per reply
+        proportional: per_char_seconds per character of reply text,
+            capped at max_seconds
+    Time already spent computing the reply counts towards the delay.
+    """
+
+    def __init__(self, mode='fixed', fixed_seconds=1.5, per_char_seconds=0.01, max_seconds=3.0):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        self.mode = mode
+        self.fixed_seconds = fixed_seconds
+        self.per_char_seconds = per_char_seconds
+        self.max_seconds = max_seconds
+
+    def delay_for(self, text):
+        """Target seconds between message receipt and reply for this text"""
+        if self.mode == 'fixed':
+            return self.fixed_seconds
+        if self.mode == 'proportional':
+            return min(self.max_seconds, len(text or '') * self.per_char_seconds)
+        return 0.0
+
+    def with_mode(self, mode):
+        return PacingPolicy(mode, self.fixed_seconds, self.per_char_seconds, self.max_seconds)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            mode=os.getenv('CHAT_PACING', 'fixed'),
+            fixed_seconds=float(os.getenv('CHAT_PACING_FIXED_SECONDS', '1.5')),
+            per_char_seconds=float(os.getenv('CHAT_PACING_SECONDS_PER_CHAR', '0.01')),
+            max_seconds=float(os.getenv('CHAT_PACING_MAX_SECONDS', '3.0'))
+        )
+
+# Deployment-wide default; sessions may override the mode
+DEFAULT_PACING = PacingPolicy.from_env()
+
+def resolve_pacing(mode=None):
+    """Deployment policy, optionally with a per-session mode override"""
+    if mode in PACING_MODES and mode != DEFAULT_PACING.mode:
+        return DEFAULT_PACING.with_mode(mode)
+    return DEFAULT_PACING
+
+async def pace(policy, started, text):
+    """Sleep out whatever remains of the policy delay since `started` (loop time)"""
+    loop = asyncio.get_running_loop()
+    remaining = policy.delay_for(text) - (loop.time() - started)
+    if remaining > 0:
+        await asyncio.sleep(remaining)
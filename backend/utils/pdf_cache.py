@@ -0,0 +1,149 @@
+"""
+PDF Report Cache
+Content-addressed cache of rendered reports, bounded by total bytes, and a
+janitor that keeps the reports directory under a size cap
+
+Most users share a report: the same rounded dosha percentages and the same
+therapy list. Reports are keyed on a hash of exactly the inputs the renderer
+uses (plus the date printed in the footer), so identical reports are
+rendered once.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from utils.simple_pdf_generator import REPORTS_DIR
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+REPORTS_MAX_BYTES = int(os.getenv('REPORTS_MAX_BYTES', str(256 * 1024 * 1024)))
+REPORTS_JANITOR_INTERVAL_SECONDS = float(os.getenv('REPORTS_JANITOR_INTERVAL_SECONDS', '300'))
+
+def report_key(dosha_results, panchakarma_recs):
+    """
+    Content hash of a report's normalized inputs
+
+    Only the fields that appear in the document are included, so requests
+    differing in unused fields (user_data, scores, explanations, key order)
+    share a key. Therapy values are keyed on the text the renderer prints.
+    """
+    percentages = dosha_results.get('percentages', {})
+    therapies = []
+    if panchakarma_recs and 'therapy_details' in panchakarma_recs:
+        therapies = [[str(therapy['name']), str(therapy['description'])] for therapy in panchakarma_recs['therapy_details']]
+    normalized = {
+        'percentages': [percentages.get(dosha) for dosha in ('vata', 'pitta', 'kapha')],
+        'therapies': therapies,
+        'date': datetime.now().strftime('%Y-%m-%d')
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class PDFReportCache:
+    """Rendered report bytes keyed by report_key, least recently used evicted past max_bytes"""
+
+    def __init__(self, max_bytes=PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = pdf_bytes
+            self._bytes += len(pdf_bytes)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+pdf_cache = PDFReportCache()
+
+def prune_reports(reports_dir=REPORTS_DIR, max_bytes=REPORTS_MAX_BYTES):
+    """
+    Delete the oldest reports until the directory is under max_bytes
+
+    Returns:
+        Number of files removed
+    """
+    try:
+        names = os.listdir(reports_dir)
+    except FileNotFoundError:
+        return 0
+    reports = []
+    for name in names:
+        if not name.endswith('.pdf'):
+            continue
+        path = os.path.join(reports_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        reports.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in reports)
+    removed = 0
+    for _, size, path in sorted(reports):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+async def reports_janitor(interval=REPORTS_JANITOR_INTERVAL_SECONDS, sweeps=()):
+    """
+    Background task enforcing REPORTS_MAX_BYTES until cancelled
+
+    sweeps are extra housekeeping callables (e.g. PDF job expiry) run on
+    the event loop every interval, so an idle server still cleans up.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(prune_reports)
+        except Exception:
+            logger.exception("Reports janitor failed")
+        for sweep in sweeps:
+            try:
+                sweep()
+            except Exception:
+                logger.exception("Reports janitor sweep failed", extra={'sweep': getattr(sweep, '__qualname__', repr(sweep))})
+        await asyncio.sleep(interval)
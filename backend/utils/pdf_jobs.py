@@ -0,0 +1,171 @@
+"""
+PDF Job Queue
+Background rendering of PDF reports: submitting returns a job id at once and
+a fixed pool of worker tasks renders queued reports into backend/reports,
+where they are served by the /reports static mount
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+
+from utils.executor import run_cpu, ExecutorSaturated
+from utils.pdf_cache import pdf_cache, report_key
+from utils.simple_pdf_generator import REPORTS_DIR, render_pdf_report, save_pdf_report
+
+logger = logging.getLogger(__name__)
+
+PDF_JOB_WORKERS = int(os.getenv('PDF_JOB_WORKERS', '2'))
+PDF_JOB_MAX_QUEUE = int(os.getenv('PDF_JOB_MAX_QUEUE', '1000'))
+PDF_JOB_TTL_SECONDS = float(os.getenv('PDF_JOB_TTL_SECONDS', '3600'))
+# How long a job keeps retrying while the CPU executor is saturated before it fails
+PDF_JOB_SATURATED_TIMEOUT_SECONDS = float(os.getenv('PDF_JOB_SATURATED_TIMEOUT_SECONDS', '30'))
+
+class PDFQueueFull(Exception):
+    """Raised when PDF_JOB_MAX_QUEUE jobs are already waiting"""
+
+class PDFJob:
+    __slots__ = ('id', 'status', 'args', 'filename', 'error', 'submitted_at', 'started_at', 'finished_at')
+
+    def __init__(self, job_id, args):
+        self.id = job_id
+        self.status = 'queued'  # queued -> running -> done | failed
+        self.args = args  # (user_data, dosha_results, panchakarma_recs) until rendered
+        self.filename = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+class PDFJobQueue:
+    """Bounded job queue drained by `workers` asyncio tasks; finished jobs are forgotten after ttl_seconds"""
+
+    def __init__(self, workers=PDF_JOB_WORKERS, max_queue=PDF_JOB_MAX_QUEUE,
+                 ttl_seconds=PDF_JOB_TTL_SECONDS, reports_dir=REPORTS_DIR,
+                 saturated_timeout=PDF_JOB_SATURATED_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.ttl_seconds = ttl_seconds
+        self.saturated_timeout = saturated_timeout
+        self.reports_dir = reports_dir
+        self.jobs = OrderedDict()  # job id -> PDFJob, in submission order
+        self._finished = deque()  # (finished_at, job id), in finishing order
+        self._queue = None
+        self._tasks = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_render_seconds = 0.0
+
+    def start(self):
+        """Start the worker tasks on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, user_data, dosha_results, panchakarma_recs):
+        """Queue a report; returns the PDFJob or raises PDFQueueFull"""
+        if self._queue is None:
+            raise RuntimeError("PDF job queue is not running; call start() first")
+        self.expire()
+        job = PDFJob(uuid.uuid4().hex, (user_data, dosha_results, panchakarma_recs))
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise PDFQueueFull(f"PDF job queue is full ({self.max_queue} waiting)")
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def file_path(self, job):
+        return os.path.join(self.reports_dir, job.filename) if job.filename else None
+
+    def expire(self):
+        """Forget jobs finished more than ttl_seconds ago; returns how many were removed"""
+        # Jobs still queued or rendering are not in _finished, so a stuck
+        # render does not hold back later finished jobs
+        cutoff = time.monotonic() - self.ttl_seconds
+        removed = 0
+        while self._finished and self._finished[0][0] <= cutoff:
+            _, job_id = self._finished.popleft()
+            removed += self.jobs.pop(job_id, None) is not None
+        return removed
+
+    async def _render(self, job):
+        user_data, dosha_results, panchakarma_recs = job.args
+        key = report_key(dosha_results, panchakarma_recs)
+        # Identical reports share one content-addressed file
+        filename = f'assessment_report_{key[:32]}.pdf'
+        try:
+            # Refresh the mtime so the reports janitor treats it as recently used
+            os.utime(os.path.join(self.reports_dir, filename))
+            return filename
+        except FileNotFoundError:
+            pass
+        pdf_bytes = pdf_cache.get(key)
+        deadline = time.monotonic() + self.saturated_timeout
+        while pdf_bytes is None:
+            try:
+                pdf_bytes = await run_cpu(render_pdf_report, user_data, dosha_results, panchakarma_recs)
+            except ExecutorSaturated:
+                if time.monotonic() >= deadline:
+                    raise ExecutorSaturated(f"CPU executor stayed saturated for {self.saturated_timeout:g}s")
+                # Interactive requests have priority on the executor; try again shortly
+                await asyncio.sleep(0.05)
+                continue
+            pdf_cache.put(key, pdf_bytes)
+        await asyncio.to_thread(save_pdf_report, pdf_bytes, self.reports_dir, filename)
+        return filename
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = 'running'
+            job.started_at = time.monotonic()
+            self.total_wait_seconds += job.started_at - job.submitted_at
+            self.running += 1
+            try:
+                job.filename = await self._render(job)
+                job.status = 'done'
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("PDF job failed", extra={'job_id': job.id})
+                job.status = 'failed'
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.args = None
+                job.finished_at = time.monotonic()
+                self._finished.append((job.finished_at, job.id))
+                self.total_render_seconds += job.finished_at - job.started_at
+                self.running -= 1
+                self._queue.task_done()
+
+    def stats(self):
+        finished = self.completed + self.failed
+        started = finished + self.running
+        return {
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'max_queue': self.max_queue,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'tracked_jobs': len(self.jobs),
+            'avg_wait_ms': self.total_wait_seconds / started * 1000 if started else 0.0,
+            'avg_render_ms': self.total_render_seconds / finished * 1000 if finished else 0.0
+        }
+
+pdf_jobs = PDFJobQueue()
@@ -0,0 +1,228 @@
+"""
+Live Profiling
+Tools for profiling a running worker without restarting it: a time-boxed
+statistical sampler producing collapsed stacks (flamegraph.pl / speedscope
+input), cProfile captures of single HTTP requests, and tracemalloc snapshots
+of the top allocators
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+
+PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+PROFILE_REQUEST_HEADER = os.getenv('PROFILE_REQUEST_HEADER', 'x-profile').lower()
+PROFILE_KEEP_REQUESTS = int(os.getenv('PROFILE_KEEP_REQUESTS', '20'))
+
+class ProfilerBusy(Exception):
+    """Raised when a profile of the same kind is already running"""
+
+def _frame_label(code):
+    filename = code.co_filename
+    # Trim to the last two path components so stacks stay readable
+    short = os.path.join(*filename.replace('\\', '/').split('/')[-2:]) if filename else '?'
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(';', ':')
+
+class SamplingProfiler:
+    """Collects stacks of every thread at a fixed interval from a background thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, seconds, interval=0.005):
+        """
+        Sample all threads for `seconds` (capped at PROFILE_MAX_SECONDS)
+
+        Returns:
+            Collapsed stacks, one "thread;outer;...;inner count" line per stack
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("A sampling profile is already running")
+        try:
+            seconds = min(seconds, PROFILE_MAX_SECONDS)
+            own_id = threading.get_ident()
+            stacks = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    labels.append(names.get(thread_id, str(thread_id)))
+                    stacks[';'.join(reversed(labels))] += 1
+                time.sleep(interval)
+            return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+        finally:
+            self._lock.release()
+
+sampler = SamplingProfiler()
+
+class RequestProfiles:
+    """
+    cProfile captures of single requests, most recent PROFILE_KEEP_REQUESTS kept
+
+    The profiler hooks the event loop thread, so coroutines of other requests
+    that run while the profiled request is awaiting are included as well.
+    """
+
+    def __init__(self, keep=PROFILE_KEEP_REQUESTS):
+        self.keep = keep
+        self._profiles = OrderedDict()  # profile id -> (path, pstats marshal dump)
+        self._active = False
+
+    def start(self):
+        if self._active:
+            raise ProfilerBusy("A request profile is already running")
+        self._active = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def finish(self, profiler, path):
+        profiler.disable()
+        self._active = False
+        profiler.create_stats()
+        profile_id = uuid.uuid4().hex[:12]
+        self._profiles[profile_id] = (path, marshal.dumps(profiler.stats))
+        while len(self._profiles) > self.keep:
+            self._profiles.popitem(last=False)
+        return profile_id
+
+    def list(self):
+        return [{'id': profile_id, 'path': path} for profile_id, (path, _) in self._profiles.items()]
+
+    def raw(self, profile_id):
+        """pstats-compatible dump (load with pstats.Stats or snakeviz), or None"""
+        entry = self._profiles.get(profile_id)
+        return entry[1] if entry else None
+
+    def report(self, profile_id, sort='cumulative', limit=50):
+        """pstats text report, or None for an unknown id"""
+        raw = self.raw(profile_id)
+        if raw is None:
+            return None
+        stats = pstats.Stats(_MarshalledStats(raw), stream=io.StringIO())
+        stats.sort_stats(sort).print_stats(limit)
+        return stats.stream.getvalue()
+
+class _MarshalledStats:
+    # pstats.Stats accepts any object with create_stats() and a stats dict
+    def __init__(self, raw):
+        self.stats = marshal.loads(raw)
+
+    def create_stats(self):
+        pass
+
+request_profiles = RequestProfiles()
+
+class ProfileRequestMiddleware:
+    """
+    ASGI middleware profiling HTTP requests that carry PROFILE_REQUEST_HEADER
+
+    `authorize(headers, client_host)` decides whether the caller may profile. The profile
+    id is returned in the X-Profile-Id response header.
+    """
+
+    def __init__(self, app, authorize):
+        self.app = app
+        self.authorize = authorize
+        self.header = PROFILE_REQUEST_HEADER.encode('latin-1')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not any(name == self.header for name, _ in scope['headers']):
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        client = scope.get('client')
+        if not self.authorize(headers, client[0] if client else None):
+            await self.app(scope, receive, send)
+            return
+        try:
+            profiler = request_profiles.start()
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
+            return
+
+        finished = {}
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start' and 'id' not in finished:
+                finished['id'] = request_profiles.finish(profiler, scope['path'])
+                message = dict(message)
+                message['headers'] = list(message.get('headers', [])) + [
+                    (b'x-profile-id', finished['id'].encode('latin-1'))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if 'id' not in finished:
+                finished['id'] = request_profiles.finish(profiler, scope['path'])
+
+def tracemalloc_start(frames=10):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    return tracemalloc_status()
+
+def tracemalloc_stop():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+    return tracemalloc_status()
+
+def tracemalloc_status():
+    current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+    return {
+        'tracing': tracemalloc.is_tracing(),
+        'frames': tracemalloc.get_traceback_limit(),
+        'current_bytes': current,
+        'peak_bytes': peak
+    }
+
+_last_snapshot = None
+
+def tracemalloc_top(limit=25, group_by='lineno'):
+    """
+    Top allocators in a new snapshot, plus growth since the previous call
+
+    Returns:
+        Dictionary with 'top' and 'growth' lists of {'location', 'size', 'count'}
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    top = [
+        {'location': _trace_location(stat.traceback, group_by), 'size': stat.size, 'count': stat.count}
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+    growth = []
+    if _last_snapshot is not None:
+        growth = [
+            {'location': _trace_location(stat.traceback, group_by), 'size': stat.size_diff, 'count': stat.count_diff}
+            for stat in snapshot.compare_to(_last_snapshot, group_by)[:limit]
+            if stat.size_diff
+        ]
+    _last_snapshot = snapshot
+    return {'status': tracemalloc_status(), 'top': top, 'growth': growth}
+
+def _trace_location(traceback, group_by):
+    if group_by == 'traceback':
+        return [f'{frame.filename}:{frame.lineno}' for frame in traceback]
+    frame = traceback[0]
+    return frame.filename if group_by == 'filename' else f'{frame.filename}:{frame.lineno}'
@@ -0,0 +1,86 @@
+"""
+Report Templates
+ReportLab styles, table styles and static story fragments built once per
+process and reused by every PDF report build
+
+Markup for fixed text (title, headings, therapy bullets, footer) and its
+resolved style are cached; each build constructs its own Paragraph from
+them, so builds running on different pool threads share no parsed
+fragments or layout state. Styles are only read while building.
+"""
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, TableStyle
+
+THERAPY_PARAGRAPH_CACHE_SIZE = 256
+
+DOSHA_COLUMN_WIDTHS = [2*inch, 2*inch]
+
+class ReportStyles:
+    """Paragraph and table styles used by the assessment report"""
+
+    def __init__(self):
+        sample = getSampleStyleSheet()
+        self.heading = sample['Heading2']
+        self.normal = sample['Normal']
+        self.title = ParagraphStyle(
+            'Title',
+            parent=sample['Heading1'],
+            fontSize=24,
+            spaceAfter=20,
+            alignment=1,
+            textColor=colors.darkgreen
+        )
+        self.footer = ParagraphStyle(
+            'Footer',
+            parent=sample['Normal'],
+            fontSize=8,
+            textColor=colors.gray,
+            alignment=1
+        )
+        self.dosha_table = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.green),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+
+@lru_cache(maxsize=1)
+def get_report_styles():
+    return ReportStyles()
+
+@lru_cache(maxsize=None)
+def _static_template(text, style_name):
+    return text, getattr(get_report_styles(), style_name)
+
+def static_paragraph(text, style_name):
+    """New paragraph for fixed text in the named ReportStyles style"""
+    return Paragraph(*_static_template(text, style_name))
+
+@lru_cache(maxsize=THERAPY_PARAGRAPH_CACHE_SIZE)
+def _therapy_markup(name, description):
+    return f"• {name}: {description}"
+
+def therapy_paragraph(therapy):
+    """New bullet paragraph for a therapy_details entry"""
+    # Client-supplied values may be any JSON type; key the cache on their text
+    markup = _therapy_markup(str(therapy['name']), str(therapy['description']))
+    return Paragraph(markup, get_report_styles().normal)
+
+@lru_cache(maxsize=8)
+def _footer_markup(date):
+    return f"Generated on: {date}"
+
+def footer_paragraph(date):
+    """New footer paragraph for a YYYY-MM-DD date"""
+    return Paragraph(_footer_markup(date), get_report_styles().footer)
+
+def template_cache_stats():
+    return {
+        'static_paragraphs': _static_template.cache_info()._asdict(),
+        'therapy_paragraphs': _therapy_markup.cache_info()._asdict(),
+        'footer_paragraphs': _footer_markup.cache_info()._asdict()
+    }
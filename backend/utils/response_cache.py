@@ -0,0 +1,150 @@
+"""
+Response Cache
+In-process TTL/LRU cache of encoded response bodies with their ETags, so
+repeated polls are answered without a database query and unchanged results
+can be revalidated with a 304
+
+The cache is per process: with several uvicorn workers an entry written by
+one worker is invalidated only there, and other workers can serve a stale
+body for at most ttl_seconds.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+ASSESSMENT_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv('ASSESSMENT_RESPONSE_CACHE_TTL_SECONDS', '300'))
+ASSESSMENT_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('ASSESSMENT_RESPONSE_CACHE_MAX_ENTRIES', '10000'))
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag) -> bool:
+    """True when an If-None-Match header value matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+class CachedResponse:
+    __slots__ = ('body', 'etag', 'stored_at')
+
+    def __init__(self, body, etag, stored_at):
+        self.body = body
+        self.etag = etag
+        self.stored_at = stored_at
+
+class ResponseCache:
+    """
+    Encoded bodies keyed by resource id; entries expire after ttl_seconds, oldest evicted past max_entries
+
+    Writers put() the new body; readers that load from the source on a miss
+    take a generation() first and store with fill(), so a slow read can
+    never replace an entry written while it was in flight.
+    """
+
+    def __init__(self, ttl_seconds=ASSESSMENT_RESPONSE_CACHE_TTL_SECONDS,
+                 max_entries=ASSESSMENT_RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> CachedResponse
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Write counter and the counter value of each key's last put/invalidate,
+        # bounded like the entries; _forgotten is the newest value dropped
+        self._writes = 0
+        self._written_at = OrderedDict()
+        self._forgotten = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body):
+        entry = CachedResponse(body, make_etag(body), time.monotonic())
+        with self._lock:
+            self._record_write(key)
+            self._store(key, entry)
+        return entry
+
+    def generation(self):
+        """Token for fill(), taken before reading the resource from its source"""
+        return self._writes
+
+    def fill(self, key, body, generation):
+        """
+        Read-through put that never overwrites newer data
+
+        The body is stored only if key was not put or invalidated since
+        generation() was taken.
+
+        Returns:
+            The entry to serve: one put meanwhile for this key if there is
+            one, otherwise an entry for body (cached or not)
+        """
+        entry = CachedResponse(body, make_etag(body), time.monotonic())
+        with self._lock:
+            if self._written_at.get(key, self._forgotten) > generation:
+                return self._entries.get(key) or entry
+            self._store(key, entry)
+        return entry
+
+    def _record_write(self, key):
+        self._writes += 1
+        self._written_at[key] = self._writes
+        self._written_at.move_to_end(key)
+        while len(self._written_at) > self.max_entries:
+            _, self._forgotten = self._written_at.popitem(last=False)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._record_write(key)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._writes += 1
+            self._written_at.clear()
+            self._forgotten = self._writes
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(len(entry.body) for entry in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+# GET /api/assessment/{session_id} bodies keyed by session_id
+assessment_cache = ResponseCache()
@@ -0,0 +1,40 @@
+"""
+Fast JSON Responses
+orjson-backed JSON encoding (stdlib json fallback) and splicing of cached,
+pre-serialized recommendation payloads into assessment responses
+"""
+import json
+from fastapi.responses import Response
+from Training.panchakarma_model import get_recommendations_json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+def dumps(content) -> bytes:
+    """Encode content as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class RawJSONResponse(Response):
+    """Response whose content is already-encoded JSON bytes"""
+
+    media_type = "application/json"
+
+def assessment_response_body(dosha_results, recs_key, **extra) -> bytes:
+    """
+    Encode an assessment response around the cached recommendation bytes
+
+    Only the per-user dosha results (and any extra fields) are encoded per
+    request; the recommendation payload for recs_key is serialized once.
+    """
+    parts = [
+        b'{"dosha_results":', dumps(dosha_results),
+        b',"panchakarma_recs":', get_recommendations_json(recs_key)
+    ]
+    for key, value in extra.items():
+        parts += [b',', dumps(key), b':', dumps(value)]
+    parts.append(b'}')
+    return b''.join(parts)
@@ -0,0 +1,236 @@
+"""
+Chat Session Stores
+Pluggable storage for per-session chat state with TTL eviction, so memory
+stays bounded and (with the database backend) state survives restarts and
+is shared between uvicorn workers
+"""
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+from utils.chat_session import ChatSession
+
+SESSION_STORE = os.getenv('SESSION_STORE', 'memory')  # 'memory' or 'database'
+SESSION_TTL_SECONDS = float(os.getenv('SESSION_TTL_SECONDS', str(6 * 3600)))
+SESSION_MAX_ENTRIES = int(os.getenv('SESSION_MAX_ENTRIES', '10000'))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', '60'))
+
+def _deep_sizeof(value, seen=None):
+    """Approximate retained size of a session in bytes"""
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in value)
+    elif hasattr(type(value), '__slots__'):
+        size += sum(_deep_sizeof(getattr(value, slot, None), seen) for slot in type(value).__slots__)
+    return size
+
+class SessionStore(ABC):
+    """
+    Interface for chat session storage
+
+    Sessions are ChatSession objects. Callers mutate the object they get
+    back and call save() at the end of each turn.
+    """
+
+    # True when operations do I/O and should run off the event loop
+    blocking = False
+
+    @abstractmethod
+    def get(self, session_id):
+        """The stored ChatSession, or None if missing or expired"""
+
+    @abstractmethod
+    def save(self, session_id, session):
+        """Store (insert or replace) a session"""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Remove a session if present"""
+
+    @abstractmethod
+    def evict_expired(self):
+        """Drop expired sessions and return how many were removed"""
+
+    @abstractmethod
+    def count(self):
+        """Number of stored sessions"""
+
+    @abstractmethod
+    def stats(self):
+        """Gauges for /health/sessions"""
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU store: sessions expire after ttl_seconds idle, oldest evicted past max_entries"""
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, max_entries=SESSION_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._sessions = OrderedDict()  # session_id -> (last_access, session)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            last_access, session = entry
+            now = time.monotonic()
+            if now - last_access > self.ttl_seconds:
+                del self._sessions[session_id]
+                self.evictions += 1
+                return None
+            self._sessions[session_id] = (now, session)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def save(self, session_id, session):
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        removed = 0
+        with self._lock:
+            # Entries are in access order, so expired ones are at the front
+            while self._sessions:
+                session_id, (last_access, _) = next(iter(self._sessions.items()))
+                if last_access > cutoff:
+                    break
+                del self._sessions[session_id]
+                removed += 1
+            self.evictions += removed
+        return removed
+
+    def count(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            sessions = [session for _, session in self._sessions.values()]
+            evictions = self.evictions
+        return {
+            'backend': 'memory',
+            'count': len(sessions),
+            'approx_bytes': sum(_deep_sizeof(session) for session in sessions),
+            'evictions': evictions,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+def _upsert(dialect_name, table, values, update_columns):
+    """INSERT ... ON CONFLICT(session_id) DO UPDATE (or MySQL's ON DUPLICATE KEY UPDATE)"""
+    if dialect_name == 'mysql':
+        statement = mysql.insert(table).values(**values)
+        return statement.on_duplicate_key_update({column: statement.inserted[column] for column in update_columns})
+    dialects = {'sqlite': sqlite, 'postgresql': postgresql}
+    if dialect_name not in dialects:
+        raise ValueError(f"Session store upsert not supported for {dialect_name}")
+    statement = dialects[dialect_name].insert(table).values(**values)
+    return statement.on_conflict_do_update(
+        index_elements=['session_id'],
+        set_={column: statement.excluded[column] for column in update_columns}
+    )
+
+class DatabaseSessionStore(SessionStore):
+    """Sessions persisted in the user_sessions table (SQLite by default via DATABASE_URL)"""
+
+    blocking = True
+
+    def __init__(self, session_factory=None, ttl_seconds=SESSION_TTL_SECONDS, session_type=ChatSession):
+        if session_factory is None:
+            from database.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.session_type = session_type
+        self.evictions = 0
+
+    @staticmethod
+    def _now():
+        # Naive UTC, matching SQLite's CURRENT_TIMESTAMP server default
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _last_active(self, UserSession):
+        return func.coalesce(UserSession.updated_at, UserSession.created_at)
+
+    def get(self, session_id):
+        from database.models import UserSession
+        cutoff = self._now() - timedelta(seconds=self.ttl_seconds)
+        with self.session_factory() as db:
+            row = (db.query(UserSession.data)
+                   .filter(UserSession.session_id == session_id)
+                   .filter(self._last_active(UserSession) > cutoff)
+                   .first())
+        if row is None or row.data is None:
+            return None
+        return self.session_type.from_dict(row.data)
+
+    def save(self, session_id, session):
+        from database.models import UserSession
+        values = {'session_id': session_id, 'data': session.to_dict(), 'updated_at': self._now()}
+        with self.session_factory() as db:
+            # One upsert statement, so workers saving a new session at the
+            # same time don't race on the session_id unique constraint
+            db.execute(_upsert(db.get_bind().dialect.name, UserSession.__table__, values, ('data', 'updated_at')))
+            db.commit()
+
+    def delete(self, session_id):
+        from database.models import UserSession
+        with self.session_factory() as db:
+            db.query(UserSession).filter(UserSession.session_id == session_id).delete()
+            db.commit()
+
+    def evict_expired(self):
+        from database.models import UserSession
+        cutoff = self._now() - timedelta(seconds=self.ttl_seconds)
+        with self.session_factory() as db:
+            removed = (db.query(UserSession)
+                       .filter(self._last_active(UserSession) <= cutoff)
+                       .delete(synchronize_session=False))
+            db.commit()
+        self.evictions += removed
+        return removed
+
+    def count(self):
+        from database.models import UserSession
+        with self.session_factory() as db:
+            return db.query(func.count(UserSession.id)).scalar()
+
+    def stats(self):
+        return {
+            'backend': 'database',
+            'count': self.count(),
+            'evictions': self.evictions,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+def create_session_store(backend=SESSION_STORE):
+    """Build the session store selected by SESSION_STORE"""
+    if backend in ('database', 'sqlite'):
+        return DatabaseSessionStore()
+    if backend == 'memory':
+        return MemorySessionStore()
+    raise ValueError(f"Unknown session store backend: {backend}")
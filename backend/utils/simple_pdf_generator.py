@@ -2,17 +2,27 @@
 Simple PDF Report Generator using ReportLab
 Creates basic Ayurvedic assessment reports
 """
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Spacer, Table
+from utils.metrics import stage
+from utils.report_templates import (
+    DOSHA_COLUMN_WIDTHS, get_report_styles, static_paragraph, therapy_paragraph, footer_paragraph
+)
 from datetime import datetime
+import io
+import logging
 import os
+import uuid
 
-def generate_pdf_report(user_data, dosha_results, panchakarma_recs):
+logger = logging.getLogger(__name__)
+
+DOC_BUILD_SECONDS = stage('doc_build')
+
+REPORTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'reports'))
+
+def render_pdf_report(user_data, dosha_results, panchakarma_recs):
     """
-    Generate a simple PDF report with assessment results
+    Build a simple PDF report with assessment results in memory
 
     Args:
         user_data: User information and assessment responses
@@ -20,37 +30,22 @@ def generate_pdf_report(user_data, dosha_results, panchakarma_recs):
         panchakarma_recs: Panchakarma therapy recommendations
 
     Returns:
-        PDF file path
+        PDF document bytes
     """
+    buffer = io.BytesIO()
 
-    # Create reports directory
-    reports_dir = os.path.join(os.path.dirname(__file__), '..', 'reports')
-    os.makedirs(reports_dir, exist_ok=True)
-
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    pdf_path = os.path.join(reports_dir, f'assessment_report_{timestamp}.pdf')
-
-    # Create PDF document
-    doc = SimpleDocTemplate(pdf_path, pagesize=A4)
-    styles = getSampleStyleSheet()
+    # Create PDF document; styles and fixed paragraph markup are shared across builds
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = get_report_styles()
     story = []
 
     # Title
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=20,
-        alignment=1,
-        textColor=colors.darkgreen
-    )
-
-    story.append(Paragraph("AyurSutra Assessment Report", title_style))
-    story.append(Paragraph("Ayurvedic Wellness Analysis", styles['Heading2']))
+    story.append(static_paragraph("AyurSutra Assessment Report", 'title'))
+    story.append(static_paragraph("Ayurvedic Wellness Analysis", 'heading'))
     story.append(Spacer(1, 20))
 
     # Dosha Results
-    story.append(Paragraph("Your Dosha Results", styles['Heading2']))
+    story.append(static_paragraph("Your Dosha Results", 'heading'))
 
     dosha_data = [
         ['Dosha', 'Percentage'],
@@ -59,35 +54,60 @@ def generate_pdf_report(user_data, dosha_results, panchakarma_recs):
         ['Kapha', f"{dosha_results['percentages']['kapha']}%"]
     ]
 
-    dosha_table = Table(dosha_data, colWidths=[2*inch, 2*inch])
-    dosha_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.green),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    dosha_table = Table(dosha_data, colWidths=DOSHA_COLUMN_WIDTHS)
+    dosha_table.setStyle(styles.dosha_table)
     story.append(dosha_table)
     story.append(Spacer(1, 20))
 
     # Therapies
     if panchakarma_recs and 'therapy_details' in panchakarma_recs:
-        story.append(Paragraph("Recommended Therapies", styles['Heading2']))
+        story.append(static_paragraph("Recommended Therapies", 'heading'))
         for therapy in panchakarma_recs['therapy_details']:
-            story.append(Paragraph(f"• {therapy['name']}: {therapy['description']}", styles['Normal']))
+            story.append(therapy_paragraph(therapy))
             story.append(Spacer(1, 10))
 
     # Footer
     story.append(Spacer(1, 30))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.gray,
-        alignment=1
-    )
-    story.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d')}", footer_style))
+    story.append(footer_paragraph(datetime.now().strftime('%Y-%m-%d')))
 
     # Build PDF
-    doc.build(story)
-    print(f"Simple PDF generated at: {pdf_path}")
-    return pdf_path
\ No newline at end of file
+    with DOC_BUILD_SECONDS.time():
+        doc.build(story)
+    return buffer.getvalue()
+
+def save_pdf_report(pdf_bytes, reports_dir=REPORTS_DIR, filename=None):
+    """
+    Write report bytes to reports_dir
+
+    Without a filename the report gets a unique timestamped name. The file is
+    written to a temporary name and renamed into place, so concurrent saves
+    never overwrite each other or expose partial files.
+
+    Returns:
+        PDF file path
+    """
+    os.makedirs(reports_dir, exist_ok=True)
+    if filename is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'assessment_report_{timestamp}_{uuid.uuid4().hex[:12]}.pdf'
+    pdf_path = os.path.join(reports_dir, filename)
+    tmp_path = f'{pdf_path}.{uuid.uuid4().hex[:8]}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, pdf_path)
+    logger.info("PDF report saved", extra={'path': pdf_path, 'bytes': len(pdf_bytes)})
+    return pdf_path
+
+def generate_pdf_report(user_data, dosha_results, panchakarma_recs):
+    """
+    Generate a simple PDF report with assessment results and save it
+
+    Args:
+        user_data: User information and assessment responses
+        dosha_results: Dosha scores and percentages
+        panchakarma_recs: Panchakarma therapy recommendations
+
+    Returns:
+        PDF file path
+    """
+    return save_pdf_report(render_pdf_report(user_data, dosha_results, panchakarma_recs))
\ No newline at end of file